@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import sys
+
+import onectf.impl.constants
+import onectf.impl.response
+
+
+async def read_response(response, max_body):
+    """Same as onectf.impl.response.read_response, for an aiohttp response."""
+    buffer = bytearray()
+    truncated = False
+    size = 0
+    async for chunk in response.content.iter_chunked(onectf.impl.constants.body_chunk_size):
+        size += len(chunk)
+        if max_body is not None and len(buffer) + len(chunk) > max_body:
+            buffer += chunk[:max_body - len(buffer)]
+            truncated = True
+            break
+        buffer += chunk
+    if truncated:
+        length = onectf.impl.response.body_length(response.headers)
+        size = len(buffer) if length is None else length
+        # do not give back a connection with unread data
+        response.close()
+    # only counted by recent versions of aiohttp
+    wire_size = getattr(response.content, 'total_raw_bytes', None)
+    # the values of a repeated header (e.g., Set-Cookie) are joined, like requests
+    headers = {name: ', '.join(response.headers.getall(name)) for name in response.headers}
+    return onectf.impl.response.Response(response.status, headers, str(response.url), bytes(buffer),
+                                         truncated, size, wire_size)
+
+
+def open_session(args):
+    try:
+        import aiohttp
+    except ImportError:
+        logging.error("[ERROR] The async engine requires 'aiohttp' (install onectf[async], or pip install aiohttp).")
+        sys.exit(2)
+
+    connector = aiohttp.TCPConnector(limit=args.threads, limit_per_host=args.pool_size,
+                                     force_close=not args.keep_alive, ssl=None if args.ssl_verify else False)
+    return aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar(),
+                                 timeout=aiohttp.ClientTimeout(total=None))
+
+
+def start_async(worker_coroutine, args, words):
+    """
+    Run 'worker_coroutine(args, session, word)' for each word on an event loop.
+    At most 'args.threads' coroutines are in flight at the same time (less with an adaptive limiter).
+    """
+    asyncio.run(_consume(worker_coroutine, args, words))
+
+
+async def _consume(worker_coroutine, args, words):
+    async with open_session(args) as session:
+        pending = set()
+        for word in words:
+            while len(pending) >= args.limiter.limit:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.add(asyncio.ensure_future(worker_coroutine(args, session, word)))
+        if pending:
+            await asyncio.wait(pending)
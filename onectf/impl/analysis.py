@@ -0,0 +1,124 @@
+import concurrent.futures
+import logging
+import threading
+
+import onectf.impl.calibration
+import onectf.impl.constants
+import onectf.impl.response
+import onectf.utils.filtering
+
+
+def analyze(predicate: onectf.utils.filtering.ResponsePredicate, output_format, response, with_content=True, word=None):
+    """
+    Apply the matchers and filters to a response.
+    Returns None when the response is rejected, otherwise the metrics of the response.
+    :param with_content: return the converted content, only needed by the output, the clusters or -v (otherwise None)
+    :param word: the payload of the response, removed from the body by the calibration rules
+    """
+    if not predicate.is_valid_head(response.status_code, response.size):
+        return None
+    # the content is only converted when a rule or the output needs it
+    body = onectf.impl.response.ResponseContent(response, output_format)
+    if predicate.needs_body and not predicate.is_valid_body(body.lines, body.content, body.words):
+        return None
+    if not predicate.is_valid_calibrated(response.status_code,
+                                         lambda name: onectf.impl.calibration.response_metric(response, body, word, name)):
+        return None
+    return {
+        "status": response.status_code,
+        "size": response.size,
+        "words": body.words,
+        "lines": body.lines,
+        "content": body.content if with_content else None,
+        "truncated": getattr(response, 'truncated', False),
+    }
+
+
+# Set in each process of the pool
+process_predicate = None
+process_output_format = None
+process_with_content = True
+
+
+def _initialize(predicate, output_format, with_content):
+    global process_predicate, process_output_format, process_with_content
+    process_predicate = predicate
+    process_output_format = output_format
+    process_with_content = with_content
+
+
+def _analyze_batch(words, responses):
+    results = []
+    for word, response in zip(words, responses):
+        try:
+            results.append(analyze(process_predicate, process_output_format, response, process_with_content, word))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class AnalysisPool:
+    def __init__(self, processes, predicate, output_format, report, done=None, with_content=True):
+        """
+        Analyze the responses in a pool of processes, so that the conversion of the responses
+        (html2text, JSON) and the regexes are not bound to the GIL of the process sending the requests.
+        The responses are sent by batches, and the number of batches waiting for a process is bounded:
+        the workers submitting a response wait when the pool is late.
+        :param report: function(word, response, result) called for each valid response
+        :param done: function(key) called for each analyzed response, after it was reported (e.g., to save the progress)
+        :param with_content: see analyze()
+        """
+        self.processes = processes
+        self.report = report
+        self.done = done
+        self.executor = concurrent.futures.ProcessPoolExecutor(processes, initializer=_initialize,
+                                                               initargs=(predicate, output_format, with_content))
+        self.pending_batches = threading.BoundedSemaphore(processes * 2)
+        self.lock = threading.Lock()
+        self.words = []
+        self.responses = []
+        self.keys = []
+
+    def submit(self, word, response, key=None):
+        """:param key: the value given to 'done' once the response is analyzed"""
+        with self.lock:
+            self.words.append(word)
+            self.responses.append(response)
+            self.keys.append(key)
+            if len(self.responses) < onectf.impl.constants.analysis_batch_size:
+                return
+            batch = self.words, self.responses, self.keys
+            self.words, self.responses, self.keys = [], [], []
+        self._submit_batch(*batch)
+
+    def _submit_batch(self, words, responses, keys):
+        self.pending_batches.acquire()
+        future = self.executor.submit(_analyze_batch, words, responses)
+        future.add_done_callback(lambda f: self._on_batch_done(words, responses, keys, f))
+
+    def _on_batch_done(self, words, responses, keys, future):
+        try:
+            # the responses of a failed batch are not done: they are tested again when resuming
+            for word, response, key, result in zip(words, responses, keys, future.result()):
+                if isinstance(result, Exception):
+                    logging.error(f'[ERROR] {result}')
+                elif result is not None:
+                    self.report(word, response, result)
+                if self.done is not None:
+                    self.done(key)
+        except Exception as e:
+            logging.error(f'[ERROR] {e}')
+        finally:
+            self.pending_batches.release()
+
+    def close(self):
+        """Analyze the last responses, and wait for all the batches."""
+        with self.lock:
+            batch = self.words, self.responses, self.keys
+            self.words, self.responses, self.keys = [], [], []
+        if batch[1]:
+            self._submit_batch(*batch)
+        self.executor.shutdown(wait=True)
+
+    def __str__(self):
+        return f'{self.processes} processes'
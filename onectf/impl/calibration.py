@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import secrets
+
+import onectf.impl.constants
+import onectf.impl.response
+
+# From the most to the least precise
+calibration_metrics = ['hash', 'size', 'words', 'lines']
+
+
+def random_words():
+    """Random payloads of different lengths, so that a payload echoed in the response changes its size."""
+    return [secrets.token_hex(length // 2) for length in onectf.impl.constants.calibration_lengths]
+
+
+def body_hash(response, word):
+    """Hash of the body without the payload, as a page may echo it (e.g., a "not found" page)."""
+    content = response.content
+    if word:
+        content = content.replace(word.encode('utf-8'), b'')
+    return hashlib.sha1(content).hexdigest()
+
+
+def response_metric(response, body: onectf.impl.response.ResponseContent, word, name):
+    """:param name: a metric of the calibration rules: size, hash, words or lines"""
+    if name == 'size':
+        return response.size
+    if name == 'hash':
+        return body_hash(response, word)
+    if name == 'words':
+        return body.words
+    return body.lines
+
+
+def calibrate(args, send_request):
+    """
+    Send random payloads before the wordlist, and filter the responses they have in common.
+    The responses are grouped by status code. For each group of responses that would be shown,
+    the first metric shared by all of them (the hash of the body without the payload, then size, words, lines)
+    is filtered, only for the responses with this status code.
+    :param args: the program data (with a predicate and an output format)
+    :param send_request: function(args, word) sending the request and returning (word, response)
+    """
+    clusters = {}
+    for word in random_words():
+        try:
+            word, response = send_request(args, word)
+        except Exception as e:
+            logging.error(f'[ERROR] Calibration failed: {e}')
+            return
+        body = onectf.impl.response.ResponseContent(response, args.format)
+        fingerprint = {name: response_metric(response, body, word, name) for name in calibration_metrics}
+        logging.debug(f'[*] Calibration {word}: Status {response.status_code}, Size: {fingerprint["size"]}, '
+                      f'Words: {fingerprint["words"]}, Lines: {fingerprint["lines"]}, Hash: {fingerprint["hash"]}')
+        if args.predicate.is_valid(response.status_code, body.lines, body.content, response.size, body.words):
+            clusters.setdefault(response.status_code, []).append(fingerprint)
+
+    for status_code, fingerprints in clusters.items():
+        for name in calibration_metrics:
+            values = {fingerprint[name] for fingerprint in fingerprints}
+            if len(values) == 1:
+                value = values.pop()
+                logging.warning(f'[*] Calibration: filtering responses with {name} {value} (status {status_code}).')
+                args.predicate.add_calibration_rule(status_code, name, value)
+                break
+        else:
+            logging.warning(f'[WARNING] Calibration: no common metric for the responses with the status {status_code}.')
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import onectf.impl.constants
+
+# Shared by all checkpoints (a lock cannot be deep-copied)
+checkpoint_lock = threading.Lock()
+
+
+class Checkpoint:
+    def __init__(self, path, wordlist):
+        """
+        Progress of a wordlist run, saved periodically in a JSON file.
+        Words are numbered in the order of the wordlist. Every word before 'offset' was tested,
+        while 'done' holds the words tested after 'offset' (workers complete words out of order).
+        :param path: the state file, or None to disable checkpoints
+        :param wordlist: the wordlist being tested (used to detect a state from another run)
+        """
+        self.path = path
+        self.wordlist = wordlist
+        self.offset = 0
+        self.done = set()
+        self.results = []
+        self.resumed = False
+        # flushed before saving, so that the saved words always have their results in the output
+        self.writer = None
+        self.last_save = time.monotonic()
+
+        if self.path is None or not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+        if state['wordlist'] != self.wordlist:
+            logging.warning(f"[WARNING] The state '{self.path}' was saved for the wordlist '{state['wordlist']}'.")
+        self.offset = state['offset']
+        self.done = set(state['done'])
+        self.results = state['results']
+        self.resumed = True
+        logging.warning(f"[*] Resuming after {self.tested()} tested words.")
+
+    def tested(self):
+        """Number of words already tested."""
+        return self.offset + len(self.done)
+
+    def skip(self, words):
+        """Number the words, skipping the ones already tested."""
+        for index, word in enumerate(words):
+            if index >= self.offset and index not in self.done:
+                yield index, word
+
+    def complete(self, index):
+        if self.path is None:
+            return
+        with checkpoint_lock:
+            self.done.add(index)
+            while self.offset in self.done:
+                self.done.remove(self.offset)
+                self.offset += 1
+            if time.monotonic() - self.last_save < onectf.impl.constants.checkpoint_interval:
+                return
+            self._write()
+
+    def save(self):
+        if self.path is None:
+            return
+        with checkpoint_lock:
+            self._write()
+
+    def _write(self):
+        self.last_save = time.monotonic()
+        if self.writer is not None:
+            self.writer.flush()
+        state = {
+            "wordlist": self.wordlist,
+            "offset": self.offset,
+            "done": sorted(self.done),
+            "results": list(self.results),
+        }
+        # Write then rename, so that a killed run never leaves a truncated state
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary_path, self.path)
+
+    def __str__(self):
+        return str(self.path)
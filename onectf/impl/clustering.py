@@ -0,0 +1,80 @@
+import hashlib
+import html
+import logging
+import re
+import urllib.parse
+
+import onectf.impl.constants
+
+
+def fingerprint(word, status_code, content):
+    """
+    Hash of a response, without the echoes of the payload (raw, URL-encoded or HTML-escaped),
+    so that the same page returned for different words has the same fingerprint.
+    """
+    echoes = [echo for echo in sorted({word, urllib.parse.quote(word), html.escape(word)}, key=len, reverse=True) if echo]
+    if echoes:
+        # an echo is not removed from a longer word (e.g., 'd' in 'found')
+        pattern = '|'.join(('(?<!\\w)' if echo[0].isalnum() else '') + re.escape(echo) +
+                           ('(?!\\w)' if echo[-1].isalnum() else '') for echo in echoes)
+        content = re.sub(pattern, '', content)
+    return hashlib.sha1(f'{status_code}:{content}'.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class ResponseClusters:
+    def __init__(self, results, max_clusters=onectf.impl.constants.max_clusters,
+                 max_samples=onectf.impl.constants.cluster_samples):
+        """
+        Group the valid responses by fingerprint. The headers and the content are only stored
+        for the first response of a cluster, the next ones only increase the count
+        and add a few sample words. The number of clusters is bounded: once it is reached,
+        the responses of a new fingerprint are only counted.
+        :param results: the list holding one entry per cluster (e.g., restored from a checkpoint)
+        """
+        self.results = results
+        self.max_clusters = max_clusters
+        self.max_samples = max_samples
+        self.clusters = {result['fingerprint']: result for result in results if 'fingerprint' in result}
+        self.unclustered = 0
+
+    def add(self, word, response, result):
+        """Returns True if the response created a new cluster."""
+        key = fingerprint(word, result["status"], result["content"])
+        cluster = self.clusters.get(key)
+        if cluster is not None:
+            cluster["count"] += 1
+            if len(cluster["samples"]) < self.max_samples:
+                cluster["samples"].append(word)
+            return False
+
+        if len(self.clusters) >= self.max_clusters:
+            if self.unclustered == 0:
+                logging.warning(f'[WARNING] More than {self.max_clusters} clusters, the next ones are only counted.')
+            self.unclustered += 1
+            return False
+
+        cluster = {
+            "fingerprint": key,
+            "count": 1,
+            "samples": [word],
+            "status": result["status"],
+            "size": result["size"],
+            "words": result["words"],
+            "lines": result["lines"],
+            "headers": dict(response.headers),
+            "content": result["content"]
+        }
+        self.clusters[key] = cluster
+        self.results.append(cluster)
+        return True
+
+    def summary(self):
+        lines = [f'{cluster["count"]:>8} x [Status: {cluster["status"]}, Size: {cluster["size"]}, '
+                 f'Words: {cluster["words"]}, Lines: {cluster["lines"]}] {", ".join(cluster["samples"])}'
+                 for cluster in sorted(self.clusters.values(), key=lambda c: c["count"], reverse=True)]
+        if self.unclustered:
+            lines.append(f'{self.unclustered:>8} x (not clustered)')
+        return '\n'.join(lines)
+
+    def __len__(self):
+        return len(self.clusters)
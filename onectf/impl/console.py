@@ -0,0 +1,111 @@
+import logging
+import queue
+import sys
+import threading
+import time
+
+import colorama
+
+import onectf.impl.constants
+
+# Shared by all consoles (a lock cannot be deep-copied)
+console_lock = threading.Lock()
+
+
+class Console:
+    def __init__(self, quiet=False, progress_interval=onectf.impl.constants.progress_interval):
+        """
+        Print the hits and the errors from a dedicated thread, so that the workers never wait for the terminal.
+        The workers only put events in a queue, and the printer thread renders them by batches.
+        In quiet mode, the hits and the errors are only counted, and a progress line is printed periodically.
+        """
+        self.quiet = quiet
+        self.progress_interval = progress_interval
+        self.completed = 0
+        self.hits = 0
+        self.errors = 0
+        self._queue = None
+        self._thread = None
+
+    def start(self):
+        """Start the printer thread (called when the job starts, and guarded if a worker calls it first)."""
+        with console_lock:
+            if self._thread is not None:
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def hit(self, word, result, headers):
+        self.start()
+        self._queue.put(('hit', word, result, headers))
+
+    def error(self, message):
+        self.start()
+        self._queue.put(('error', message))
+
+    def print(self, message):
+        """Print a line (e.g., a finding of the crawler), unless quiet."""
+        self.start()
+        self._queue.put(('line', message))
+
+    def word_done(self):
+        with console_lock:
+            self.completed += 1
+
+    def close(self):
+        """Print the remaining events (and the last progress line in quiet mode)."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def progress(self):
+        return f'[*] Progress: {self.completed} words, {self.hits} hits, {self.errors} errors'
+
+    def _run(self):
+        last_progress = time.monotonic()
+        closed = False
+        while not closed:
+            timeout = max(0, last_progress + self.progress_interval - time.monotonic()) if self.quiet else None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < onectf.impl.constants.console_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for event in batch:
+                if event is None:
+                    closed = True
+                elif event[0] == 'hit':
+                    self.hits += 1
+                    if not self.quiet:
+                        lines.append(self._render_hit(*event[1:]))
+                elif event[0] == 'line':
+                    if not self.quiet:
+                        lines.append(event[1] + '\n')
+                else:
+                    self.errors += 1
+                    if not self.quiet:
+                        lines.append(event[1] + '\n')
+            if self.quiet and (closed or time.monotonic() - last_progress >= self.progress_interval):
+                last_progress = time.monotonic()
+                lines.append(self.progress() + '\n')
+            if lines:
+                sys.stdout.write(''.join(lines))
+                sys.stdout.flush()
+
+    @staticmethod
+    def _render_hit(word, result, headers):
+        line = colorama.Fore.GREEN + '[+] ' + colorama.Style.BRIGHT + \
+            f'{word:<25} [Status: {result["status"]}, Size: {result["size"]}{" (truncated)" if result.get("truncated") else ""}, Words: {result["words"]}, Lines: {result["lines"]}]\x1b[0m\n' + \
+            colorama.Fore.RESET + '\n'
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            line += f'\nResponse Headers: \n\n{headers}\n' + f'\nResponse Content: \n\n{result["content"]}\n'
+        return line
@@ -3,5 +3,57 @@ version = "1.5.1-dev"
 # Filtering
 default_status_codes = "200-299,301,302,307,401,403,405,500"
 
+# Responses
+default_max_body = "10M"
+body_chunk_size = 64 * 1024
+
 # Injection
 injection_token = "$_INJECT_$"
+
+# Workers
+queue_size_per_thread = 16
+
+# Resume
+checkpoint_interval = 5
+
+# Rate limiting (adaptive concurrency)
+adaptive_throttled_ratio = 0.05
+adaptive_latency_factor = 2
+
+# Calibration (length of the random payloads)
+calibration_lengths = [8, 16, 24, 32]
+
+# Analysis (number of responses sent at once to a process)
+analysis_batch_size = 32
+
+# Tampered wordlists saved with --tamper-cache
+tamper_cache_directory = "~/.cache/onectf/tamper"
+
+# Clustering of the valid responses (--cluster)
+max_clusters = 1000
+cluster_samples = 5
+
+# Results written by the output thread (-o)
+output_queue_size = 1024
+output_batch_size = 64
+
+# Console (printer thread)
+console_batch_size = 256
+progress_interval = 10
+
+# Live stats (--stats, --stats-file)
+stats_interval = 5
+stats_latency_samples = 1024
+
+# Crawl frontier (URLs already seen)
+frontier_set_size = 250000
+frontier_bloom_capacity = 10000000
+frontier_bloom_error_rate = 0.001
+
+# Crawl link extraction (number of parsed URLs kept in a LRU cache)
+url_cache_size = 65536
+
+# Crawl endpoints found in the scripts
+js_chunk_size = 1024 * 1024
+js_max_endpoint_length = 2048
+js_cache_size = 256
@@ -1,13 +1,27 @@
+import http.cookiejar
 import logging
 import colorama
+import requests
+import requests.adapters
 import sys
+import threading
 
+import onectf.impl.ratelimit
+import onectf.impl.raw
+import onectf.impl.stats
 import onectf.utils.filtering
 
+# Sessions are created lazily (locks and thread-local data cannot be deep-copied)
+session_lock = threading.Lock()
+
 
 class BaseProgramData:
     def __init__(self, args):
         self.threads = args.threads
+        self.stats = onectf.impl.stats.Stats(args.stats, args.stats_file)
+        self.limiter = onectf.impl.ratelimit.RateLimiter(onectf.impl.ratelimit.parse_rate(args.rate),
+                                                         onectf.impl.ratelimit.parse_rate(args.host_rate),
+                                                         args.adaptive, int(self.threads), self.stats)
         if args.is_info:
             self.verbosity = logging.INFO
         elif args.is_debug:
@@ -20,7 +34,8 @@ class BaseProgramData:
 
     def __str__(self):
         return f"Verbose={logging.getLevelName(self.verbosity)}, " \
-               f"Threads={self.threads}"
+               f"Threads={self.threads}, " \
+               f"Rate Limit={self.limiter}"
 
 
 class HttpProgramData(BaseProgramData):
@@ -31,6 +46,19 @@ class HttpProgramData(BaseProgramData):
         """
         super().__init__(args)
 
+        # A raw request file replaces the URL, the method, the headers and the body
+        self.raw_request = None
+        self.raw_client = None
+        if args.raw_request is not None:
+            self.raw_request = onectf.impl.raw.RawRequest(args.raw_request, args.url)
+            if args.headers or args.body:
+                logging.warning(f'[WARNING] Ignored -H and -d as the request is read from {self.raw_request}.')
+            args.url, args.method = self.raw_request.url, self.raw_request.method
+            args.headers, args.body = None, None
+        elif args.url is None:
+            logging.error(f'[ERROR] A target URL (-u) or a request file (-r) is required.')
+            sys.exit(2)
+
         if args.url.startswith("http"):
             self.url = args.url
         else:
@@ -57,15 +85,48 @@ class HttpProgramData(BaseProgramData):
         self.ssl_verify = args.ssl_verify
         self.allow_redirects = not args.nr
 
+        self.pool_size = args.pool_size or int(self.threads)
+        self.keep_alive = args.keep_alive
+        self._adapter = None
+        self._sessions = None
+        if self.raw_request is not None:
+            self.raw_client = onectf.impl.raw.RawClient(self.url, self.ssl_verify, self.keep_alive)
+
+    def get_session(self) -> requests.Session:
+        """
+        Each worker has its own session, so cookies set by a response are never shared.
+        The connection pool is shared by all sessions, and connections are kept alive
+        between words: a worker performs one handshake per host instead of one per request.
+        """
+        with session_lock:
+            if self._sessions is None:
+                self._adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size,
+                                                              pool_maxsize=self.pool_size, pool_block=True)
+                self._sessions = threading.local()
+            session = getattr(self._sessions, 'session', None)
+            if session is None:
+                session = requests.Session()
+                session.mount('http://', self._adapter)
+                session.mount('https://', self._adapter)
+                # Requests must not depend on the cookies returned for the previous words
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                if not self.keep_alive:
+                    session.headers['Connection'] = 'close'
+                self._sessions.session = session
+        return session
+
     def __str__(self):
         return f"{super().__str__()}, " \
                f"URL={self.url}, " \
+               f"Request File={self.raw_request}, " \
                f"Method={self.method}, " \
                f"Headers={self.headers}, " \
                f"Cookies={self.cookies}, " \
                f"Body={self.body}, " \
                f"SSL Verify={self.ssl_verify}, " \
-               f"Follow Redirects={self.allow_redirects}"
+               f"Follow Redirects={self.allow_redirects}, " \
+               f"Pool Size={self.pool_size}, " \
+               f"Keep Alive={self.keep_alive}"
 
 
 class HttpProgramDataWithFilters(HttpProgramData):
@@ -73,3 +134,6 @@ class HttpProgramDataWithFilters(HttpProgramData):
         super().__init__(args)
         self.matcher = onectf.utils.filtering.FilteringHandler(False, args.mc, args.ml, args.mr, args.ms, args.mw)
         self.filter = onectf.utils.filtering.FilteringHandler(True, args.fc, args.fl, args.fr, args.fs, args.fw)
+        self.predicate = onectf.utils.filtering.ResponsePredicate(self.matcher, self.filter)
+        self.auto_calibrate = args.auto_calibrate
+        self.max_body = args.max_body
@@ -0,0 +1,69 @@
+import collections
+import hashlib
+import re
+
+import onectf.impl.constants
+
+_max = onectf.impl.constants.js_max_endpoint_length
+# A single pattern for every kind of endpoint, each alternative captures the endpoint in its own group.
+# The lookahead rejects most positions on the first character.
+endpoint_regex = re.compile(
+    rb'(?=[fa$."\'`])(?:'
+    # fetch('...'), axios.get('...'), $.post('...'), xhr.open('GET', '...')
+    rb'(?:\bfetch|\baxios(?:\.[a-z]+)?|\$\.(?:get|post|ajax|getJSON)|\.open\s*\(\s*["\'`][A-Za-z]+["\'`]\s*,)'
+    rb'\s*\(?\s*["\'`]([^"\'`\s<>\\]{1,%d})["\'`]'
+    rb'|["\'`](?:'
+    # '<scheme>://...'
+    rb'(https?://[^"\'`\s<>\\]{1,%d})'
+    # '/path'
+    rb'|(/(?![/*])[^"\'`\s<>\\]{1,%d})'
+    # 'api/...', '../v1/...'
+    rb'|((?:\.{1,2}/)?(?:api|rest|graphql|v\d+)/[^"\'`\s<>\\]{0,%d})'
+    rb')["\'`])' % (_max, _max, _max, _max)
+)
+
+
+def find_endpoints(data, chunk_size=onectf.impl.constants.js_chunk_size,
+                   max_length=onectf.impl.constants.js_max_endpoint_length):
+    """
+    Find the endpoints (paths, URLs, fetch/XHR calls and API routes) in a script.
+    The script (bytes) is never decoded or copied: it is scanned by windows of 'chunk_size' bytes,
+    each window overlapping the next one by the length of the longest endpoint.
+    """
+    data = memoryview(data)
+    endpoints = {}
+    for start in range(0, len(data), chunk_size):
+        end = min(len(data), start + chunk_size + max_length + 16)
+        for match in endpoint_regex.finditer(data, start, end):
+            # the next window finds the matches starting after this chunk
+            if match.start() >= start + chunk_size:
+                break
+            # keep the static prefix of template literals
+            endpoints[match.group(match.lastindex).split(b'${')[0]] = None
+    return [endpoint.decode('utf-8', 'replace') for endpoint in endpoints if endpoint and endpoint != b'/']
+
+
+class EndpointMiner:
+    def __init__(self, cache_size=onectf.impl.constants.js_cache_size):
+        """
+        Find the endpoints of the scripts, caching them by hash of the content of the script,
+        so that a script served at several URLs (e.g., a vendor bundle) is only scanned once.
+        """
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        self.scanned = 0
+        self.cached = 0
+
+    def mine(self, data):
+        key = hashlib.sha1(data).digest()
+        endpoints = self.cache.get(key)
+        if endpoints is not None:
+            self.cached += 1
+            self.cache.move_to_end(key)
+            return endpoints
+        self.scanned += 1
+        endpoints = find_endpoints(data)
+        self.cache[key] = endpoints
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return endpoints
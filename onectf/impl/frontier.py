@@ -0,0 +1,123 @@
+import functools
+import hashlib
+import math
+import urllib.parse
+
+import onectf.impl.constants
+
+default_ports = {'http': 80, 'https': 443}
+
+
+def remove_dot_segments(path):
+    segments = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != '.':
+            segments.append(segment)
+    # '/a/b/..' is the folder '/a/'
+    if path.endswith(('/.', '/..')):
+        segments.append('')
+    return '/'.join(segments)
+
+
+@functools.lru_cache(maxsize=onectf.impl.constants.url_cache_size)
+def canonical_url(url):
+    """
+    The form of a URL used to decide if two URLs are the same page. The scheme and the host are lowercased,
+    the default port, the fragment and the dot segments are removed, and the query parameters are sorted.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return url
+    host = parsed.hostname or ''
+    netloc = f'[{host}]' if ':' in host else host
+    if port is not None and default_ports.get(scheme) != port:
+        netloc += f':{port}'
+    if '@' in parsed.netloc:
+        netloc = parsed.netloc.rpartition('@')[0] + '@' + netloc
+    path = remove_dot_segments(parsed.path) or '/'
+    query = '&'.join(sorted(parameter for parameter in parsed.query.split('&') if parameter))
+    return urllib.parse.urlunsplit((scheme, netloc, path, query, ''))
+
+
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+
+def url_hash(url):
+    """64-bit hash of the canonical URL."""
+    return hash64(canonical_url(url))
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        """A Bloom filter of 64-bit hashes, the k indexes are derived from the two halves of the hash."""
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, value):
+        """Returns True if the value was not in the filter."""
+        low, high = value & 0xffffffff, (value >> 32) | 1
+        added = False
+        for i in range(self.hashes):
+            index = (low + i * high) % self.size
+            mask = 1 << (index & 7)
+            if not self.bits[index >> 3] & mask:
+                self.bits[index >> 3] |= mask
+                added = True
+        return added
+
+    def __contains__(self, value):
+        low, high = value & 0xffffffff, (value >> 32) | 1
+        return all(self.bits[index >> 3] & (1 << (index & 7))
+                   for index in ((low + i * high) % self.size for i in range(self.hashes)))
+
+
+class UrlFrontier:
+    def __init__(self, max_set_size=onectf.impl.constants.frontier_set_size,
+                 bloom_capacity=onectf.impl.constants.frontier_bloom_capacity,
+                 error_rate=onectf.impl.constants.frontier_bloom_error_rate):
+        """
+        The URLs already seen (queued or fetched), compared by canonical form.
+        Only a 64-bit hash of each URL is kept. Past 'max_set_size' URLs, the hashes are moved
+        into a Bloom filter: the memory stays bounded, but a few new URLs ('error_rate')
+        may be considered as seen.
+        """
+        self.max_set_size = max_set_size
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.hashes = set()
+        self.bloom = None
+        self.count = 0
+
+    def add(self, url):
+        """Returns True if the URL was not seen before."""
+        value = url_hash(url)
+        if self.bloom is not None:
+            added = self.bloom.add(value)
+        else:
+            added = value not in self.hashes
+            self.hashes.add(value)
+            if len(self.hashes) > self.max_set_size:
+                self._use_bloom_filter()
+        self.count += added
+        return added
+
+    def _use_bloom_filter(self):
+        self.bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+        for value in self.hashes:
+            self.bloom.add(value)
+        self.hashes = set()
+
+    def __contains__(self, url):
+        value = url_hash(url)
+        return value in self.bloom if self.bloom is not None else value in self.hashes
+
+    def __len__(self):
+        return self.count
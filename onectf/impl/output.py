@@ -0,0 +1,145 @@
+import csv
+import json
+import logging
+import os
+import queue
+import threading
+
+import onectf.impl.constants
+
+output_formats = ['json', 'jsonl', 'csv']
+
+# Shared by all writers (a lock cannot be deep-copied)
+writer_lock = threading.Lock()
+
+
+def result_entry(word, response, result):
+    """The entry saved for a valid response."""
+    return {
+        "word": word,
+        "status": result["status"],
+        "size": result["size"],
+        "words": result["words"],
+        "lines": result["lines"],
+        "headers": dict(response.headers),
+        "content": result["content"]
+    }
+
+
+class ResultWriter:
+    def __init__(self, path, output_format='json', append=False):
+        """
+        Write the results while they arrive, from a dedicated thread.
+        The workers only put the entries in a bounded queue, and the writer thread writes
+        them by batches, flushing the file after each batch.
+        * json: a JSON array, closed when the writer is closed
+        * jsonl: one JSON object per line
+        * csv: one row per entry, the nested values (e.g., headers) are JSON-encoded
+        :param append: continue the file of a previous run (e.g., when resuming)
+        """
+        self.path = path
+        self.format = output_format
+        self.append = append
+        self.count = 0
+        self._queue = None
+        self._thread = None
+        self._file = None
+        self._csv = None
+
+    def start(self):
+        # the workers may write their first result at the same time
+        with writer_lock:
+            if self._thread is not None:
+                return
+            self._queue = queue.Queue(maxsize=onectf.impl.constants.output_queue_size)
+            self._open()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def write(self, entry):
+        self.start()
+        self._queue.put(entry)
+
+    def flush(self):
+        """Wait until every entry written before is in the file."""
+        if self._thread is None:
+            return
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self):
+        self.start()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _open(self):
+        exists = self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if self.format == 'json':
+            if exists and self._reopen_json_array():
+                return
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write('[')
+        else:
+            self._file = open(self.path, 'a' if exists else 'w', encoding='utf-8', newline='')
+            # the header of a CSV file is written with the first entry
+            self.count = 1 if exists else 0
+
+    def _reopen_json_array(self):
+        """Remove the closing bracket of the array written by the previous run."""
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            f.seek(max(0, size - 4096))
+            tail = f.read()
+        stripped = tail.rstrip()
+        if not stripped.endswith(b']'):
+            logging.warning(f'[WARNING] {self.path} is not a JSON array, it is overwritten.')
+            return False
+        os.truncate(self.path, size - len(tail) + len(stripped) - 1)
+        self.count = 0 if stripped[:-1].rstrip() == b'[' else 1
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return True
+
+    def _run(self):
+        closed = False
+        while not closed:
+            batch = [self._queue.get()]
+            while len(batch) < onectf.impl.constants.output_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = []
+            for item in batch:
+                if item is None:
+                    closed = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    try:
+                        self._write_entry(item)
+                    except Exception as e:
+                        logging.error(f'[ERROR] Cannot write the result: {e}')
+            if closed and self.format == 'json':
+                self._file.write('\n]\n')
+            self._file.flush()
+            for event in events:
+                event.set()
+        self._file.close()
+
+    def _write_entry(self, entry):
+        if self.format == 'json':
+            self._file.write(('\n' if self.count == 0 else ',\n') + json.dumps(entry, indent=2))
+        elif self.format == 'jsonl':
+            self._file.write(json.dumps(entry) + '\n')
+        else:
+            row = {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in entry.items()}
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._file, fieldnames=list(row.keys()))
+                if self.count == 0:
+                    self._csv.writeheader()
+            self._csv.writerow(row)
+        self.count += 1
+
+    def __str__(self):
+        return f'{self.path} ({self.format})'
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+import onectf.impl.constants
+
+# Shared by all limiters (a condition cannot be deep-copied)
+limiter_condition = threading.Condition()
+
+throttling_status_codes = [429, 503]
+
+
+def parse_rate(string):
+    """
+    Parse a rate such as '50', '50/s' or '600/m' into a number of requests per second.
+    """
+    if string is None:
+        return None
+    value, _, unit = string.partition('/')
+    units = {'': 1, 's': 1, 'm': 60, 'h': 3600}
+    try:
+        rate = float(value) / units[unit.strip()]
+    except (KeyError, ValueError):
+        rate = 0
+    if rate <= 0:
+        print(f'[ERROR] Invalid rate ({string})')
+        sys.exit(2)
+    return rate
+
+
+class RateLimiter:
+    def __init__(self, rate, host_rate, adaptive, max_concurrency, stats=None):
+        """
+        Token bucket shared by all the workers, with one global bucket and one bucket per host.
+        Each bucket holds a single token, so requests are evenly spaced instead of sent by bursts.
+        In adaptive mode, the number of in-flight requests grows while the target answers quickly,
+        and shrinks when the latency increases or when the target starts throttling (429/503/errors).
+        :param rate: requests per second for all the hosts, or None
+        :param host_rate: requests per second for each host, or None
+        :param adaptive: adjust the concurrency between 1 and 'max_concurrency'
+        :param max_concurrency: the number of threads (or in-flight requests)
+        :param stats: the stats recording each request, or None
+        """
+        self.rate = rate
+        self.host_rate = host_rate
+        self.adaptive = adaptive
+        self.max_concurrency = max_concurrency
+        self.limit = max(1, max_concurrency // 2) if adaptive else max_concurrency
+        self.in_flight = 0
+        self.stats = stats
+
+        # next time a token is available
+        self._next_global = 0
+        self._next_hosts = {}
+
+        # adaptive concurrency samples
+        self._samples = 0
+        self._throttled = 0
+        self._latency_sum = 0
+        self._best_latency = None
+
+    def reserve(self, host):
+        """Take a token, and return how long the caller must wait before using it."""
+        now = time.monotonic()
+        wait = 0
+        with limiter_condition:
+            if self.rate is not None:
+                self._next_global = max(self._next_global, now)
+                wait = self._next_global - now
+                self._next_global += 1 / self.rate
+            if self.host_rate is not None:
+                # the host token is used at the time of the global token
+                next_host = max(self._next_hosts.get(host, 0), now + wait)
+                wait = next_host - now
+                self._next_hosts[host] = next_host + 1 / self.host_rate
+        return wait
+
+    def acquire(self, host):
+        """Wait for a concurrency slot and a token (threads)."""
+        with limiter_condition:
+            while self.in_flight >= self.limit:
+                limiter_condition.wait()
+            self.in_flight += 1
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host):
+        """Wait for a token (the event loop enforces the concurrency using 'limit')."""
+        wait = self.reserve(host)
+        with limiter_condition:
+            self.in_flight += 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, latency, status_code=None, error=False):
+        with limiter_condition:
+            self.in_flight -= 1
+            if self.adaptive:
+                self._adapt(latency, error or status_code in throttling_status_codes)
+            limiter_condition.notify_all()
+
+    def _adapt(self, latency, throttled):
+        self._samples += 1
+        self._throttled += throttled
+        self._latency_sum += latency
+        if not throttled and (self._best_latency is None or latency < self._best_latency):
+            self._best_latency = latency
+
+        # Evaluate once per "round" of requests
+        if self._samples < self.limit:
+            return
+
+        average_latency = self._latency_sum / self._samples
+        is_overloaded = self._throttled / self._samples > onectf.impl.constants.adaptive_throttled_ratio or \
+            (self._best_latency is not None and
+             average_latency > self._best_latency * onectf.impl.constants.adaptive_latency_factor)
+        previous_limit = self.limit
+        if is_overloaded:
+            self.limit = max(1, int(self.limit * 0.75))
+        elif self.limit < self.max_concurrency:
+            self.limit += 1
+        if previous_limit != self.limit:
+            logging.debug(f'[*] Concurrency {previous_limit} -> {self.limit} '
+                          f'(latency: {average_latency:.3f}s, throttled: {self._throttled}/{self._samples})')
+
+        self._samples = 0
+        self._throttled = 0
+        self._latency_sum = 0
+
+    def slot(self, host):
+        """Context manager (sync or async) around a request sent to 'host'."""
+        return RateLimiterSlot(self, host)
+
+    def __str__(self):
+        rate = 'unlimited' if self.rate is None else f'{self.rate:g}/s'
+        host_rate = 'unlimited' if self.host_rate is None else f'{self.host_rate:g}/s'
+        return f'(rate: {rate}, per host: {host_rate}, adaptive: {self.adaptive})'
+
+
+class RateLimiterSlot:
+    def __init__(self, limiter, host):
+        """Set 'status_code' once the response is received, an exception is counted as an error."""
+        self.limiter = limiter
+        self.host = host
+        self.status_code = None
+        self.started = None
+
+    def __enter__(self):
+        self.limiter.acquire(self.host)
+        self._begin()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        latency = time.monotonic() - self.started
+        self.limiter.release(latency, self.status_code, exc_type is not None)
+        if self.limiter.stats is not None:
+            self.limiter.stats.record(latency, self.status_code, exc_type)
+
+    async def __aenter__(self):
+        await self.limiter.acquire_async(self.host)
+        self._begin()
+        return self
+
+    def _begin(self):
+        if self.limiter.stats is not None:
+            self.limiter.stats.begin()
+        self.started = time.monotonic()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
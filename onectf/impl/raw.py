@@ -0,0 +1,215 @@
+import http.client
+import logging
+import socket
+import ssl
+import sys
+import threading
+import urllib.parse
+
+import onectf.impl.constants
+import onectf.impl.response
+import onectf.impl.template
+
+# Connections are created lazily (locks and thread-local data cannot be deep-copied)
+connection_lock = threading.Lock()
+
+# Headers computed for each word (the body is sent with its length), or removed as the responses are not decompressed
+ignored_headers = ['content-length', 'transfer-encoding', 'accept-encoding']
+
+
+def decode_chunked(body):
+    """The body of a request saved with "Transfer-Encoding: chunked", without the chunks."""
+    data = b''
+    while True:
+        size, _, body = body.partition(b'\n')
+        size = int(size.split(b';')[0].strip() or b'0', 16)
+        if size == 0:
+            return data
+        data += body[:size]
+        # skip the CRLF (or LF) after the chunk
+        body = body[size:].partition(b'\n')[2]
+
+
+def encode_word(word):
+    """Words are inserted as UTF-8 bytes in a request handled as latin-1 (one character per byte)."""
+    return word.encode('utf-8').decode('latin-1')
+
+
+class RawRequest:
+    def __init__(self, path, url=None):
+        """
+        A raw HTTP request (e.g., saved from a proxy), parsed once.
+        The keywords can be anywhere: request line, headers or body (e.g., in a multipart boundary).
+        :param path: the file with the request
+        :param url: the scheme and host the request is sent to (default: http:// and the Host header)
+        """
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            logging.error(f"[ERROR] Request file '{path}' not found.")
+            sys.exit(2)
+
+        # Proxies save the request with CRLF, but editors may have replaced them with LF
+        for separator in [b'\r\n\r\n', b'\n\n']:
+            head, found, body = data.partition(separator)
+            if found:
+                break
+        lines = head.decode('latin-1').replace('\r\n', '\n').strip('\n').split('\n')
+        try:
+            # the version is ignored: the requests are sent over HTTP/1.1 (e.g., proxies save HTTP/2 requests as-is)
+            self.method, self.target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            logging.error(f"[ERROR] Invalid request line in '{path}': {lines[0]}")
+            sys.exit(2)
+
+        self.headers = []
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            self.headers.append((name.strip(), value.strip()))
+        # The chunks are decoded, the body is sent with its length instead
+        is_chunked = any(name.lower() == 'transfer-encoding' and 'chunked' in value.lower()
+                         for name, value in self.headers)
+        if is_chunked:
+            try:
+                body = decode_chunked(body)
+            except ValueError:
+                logging.error(f"[ERROR] Invalid chunked body in '{path}'.")
+                sys.exit(2)
+        self.body = body.decode('latin-1')
+        self.has_content_length = is_chunked or any(name.lower() == 'content-length' for name, _ in self.headers)
+
+        host = next((value for name, value in self.headers if name.lower() == 'host'), None)
+        if self.target.startswith('http://') or self.target.startswith('https://'):
+            parsed_target = urllib.parse.urlsplit(self.target)
+            target = urllib.parse.urlunsplit(('', '', parsed_target.path, parsed_target.query, ''))
+            default_url = f'{parsed_target.scheme}://{parsed_target.netloc}'
+        else:
+            target = self.target
+            default_url = None if host is None else f'http://{host}'
+        url = url or default_url
+        if url is None:
+            logging.error(f"[ERROR] No Host header in '{path}', use -u to give the target.")
+            sys.exit(2)
+        if not url.startswith("http"):
+            url = "http://" + url
+        parsed_url = urllib.parse.urlsplit(url)
+        self.url = f'{parsed_url.scheme}://{parsed_url.netloc}{target}'
+
+    def compile(self, keywords):
+        return RawRequestTemplate(self, keywords)
+
+    def __str__(self):
+        return self.path
+
+
+class RawRequestTemplate:
+    def __init__(self, request: RawRequest, keywords):
+        """The request compiled into latin-1 templates, rendered as the bytes sent for each word."""
+        headers = ''.join(f'{name}: {value}\r\n' for name, value in request.headers
+                          if name.lower() not in ignored_headers)
+        self.head = onectf.impl.template.StringTemplate(
+            f'{request.method} {request.target} HTTP/1.1\r\n{headers}', keywords, encode_word)
+        self.body = onectf.impl.template.StringTemplate(request.body, keywords, encode_word)
+        self.url = onectf.impl.template.StringTemplate(request.url, keywords)
+        self.has_content_length = request.has_content_length
+        if len(onectf.impl.template.StringTemplate(urllib.parse.urlsplit(request.url).netloc, keywords).slots) > 0:
+            logging.error(f"[ERROR] The keywords cannot be used in the target host, use -u to give the target.")
+            sys.exit(2)
+        self.slots = set(self.head.slots + self.body.slots)
+
+    def render(self, words):
+        """Returns the URL, the method and the bytes of the request."""
+        head = self.head.render(words)
+        body = self.body.render(words)
+        if body or self.has_content_length:
+            head += f'Content-Length: {len(body)}\r\n'
+        method = head.split(' ', 1)[0]
+        return self.url.render(words), method, (head + '\r\n' + body).encode('latin-1')
+
+
+class RawClient:
+    def __init__(self, url, ssl_verify, keep_alive):
+        """
+        Send raw requests over HTTP/1.1, without building a requests.Request for each word.
+        Each worker keeps its own connection alive between words. Redirects are not followed.
+        """
+        parsed_url = urllib.parse.urlsplit(url)
+        self.is_https = parsed_url.scheme == 'https'
+        self.host = parsed_url.hostname
+        self.netloc = parsed_url.netloc
+        self.port = parsed_url.port or (443 if self.is_https else 80)
+        self.ssl_verify = ssl_verify
+        self.keep_alive = keep_alive
+        self._context = None
+        self._connections = None
+
+    def _connect(self):
+        connection = socket.create_connection((self.host, self.port))
+        if self.is_https:
+            with connection_lock:
+                if self._context is None:
+                    self._context = ssl.create_default_context()
+                    if not self.ssl_verify:
+                        self._context.check_hostname = False
+                        self._context.verify_mode = ssl.CERT_NONE
+            connection = self._context.wrap_socket(connection, server_hostname=self.host)
+        return connection
+
+    def _close(self):
+        self._connections.connection.close()
+        self._connections.connection = None
+
+    def send(self, url, method, data, max_body) -> onectf.impl.response.Response:
+        with connection_lock:
+            if self._connections is None:
+                self._connections = threading.local()
+        connection = getattr(self._connections, 'connection', None)
+
+        # A kept-alive connection may have been closed by the server: retry once with a new one
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect()
+                self._connections.connection = connection
+            try:
+                connection.sendall(data)
+                response = http.client.HTTPResponse(connection, method=method)
+                response.begin()
+                break
+            except (OSError, http.client.HTTPException):
+                self._close()
+                connection = None
+                if not reused:
+                    raise
+                reused = False
+
+        buffer = bytearray()
+        truncated = False
+        size = 0
+        try:
+            while chunk := response.read(onectf.impl.constants.body_chunk_size):
+                size += len(chunk)
+                if max_body is not None and len(buffer) + len(chunk) > max_body:
+                    buffer += chunk[:max_body - len(buffer)]
+                    truncated = True
+                    break
+                buffer += chunk
+            # the body is never decompressed: the size is the remaining length if known, or the bytes kept
+            if truncated:
+                size = len(buffer) if response.length is None else size + response.length
+        except Exception:
+            self._close()
+            raise
+        # The connection is unusable when the body was not read until the end
+        will_close = response.will_close or truncated or not self.keep_alive
+        response.close()
+        if will_close:
+            self._close()
+        # the body is never decompressed, so the size on the wire is the size of the body
+        return onectf.impl.response.Response(response.status, response.getheaders(), url, bytes(buffer),
+                                             truncated, size, size)
+
+    def __str__(self):
+        return f'{"https" if self.is_https else "http"}://{self.netloc}'
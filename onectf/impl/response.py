@@ -0,0 +1,112 @@
+import functools
+import json
+
+import html2text
+import requests.compat
+import requests.structures
+import requests.utils
+
+import onectf.impl.constants
+
+
+class Response:
+    def __init__(self, status_code, headers, url, content, truncated=False, size=None, wire_size=None):
+        """
+        A response whose body was read by chunks, up to a maximum size.
+        It exposes the attributes of a requests.Response that are used by the jobs.
+        :param content: the body (bytes), possibly truncated
+        :param truncated: whether the body was larger than the maximum size
+        :param size: the size of the (decoded) body, defaults to the length of the content. When truncated, this is
+        the Content-Length if known, otherwise the number of bytes kept (the rest of the body is never read).
+        :param wire_size: the number of bytes received on the wire (e.g., compressed), if known
+        """
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.url = url
+        self.content = content
+        self.truncated = truncated
+        self.size = len(content) if size is None else size
+        self.wire_size = wire_size
+
+    @functools.cached_property
+    def text(self):
+        # Decoded on demand, and like requests.Response.text
+        encoding = requests.utils.get_encoding_from_headers(self.headers) or \
+            requests.compat.chardet.detect(self.content)['encoding'] or 'utf-8'
+        return str(self.content, encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def body_length(headers):
+    """The Content-Length, when it is the size of the decoded body (no Content-Encoding)."""
+    if headers.get('Content-Encoding', 'identity').lower() != 'identity':
+        return None
+    try:
+        return int(headers['Content-Length'])
+    except (KeyError, ValueError):
+        return None
+
+
+def read_response(response: requests.Response, max_body) -> Response:
+    """
+    Read the body of a streamed response (stream=True), stopping after 'max_body' bytes (None for no limit).
+    The bytes are counted while they are received, so the size doesn't rely on the Content-Length header
+    (missing in chunked responses), and the body is never copied a second time to measure it.
+    The size of a truncated body is the Content-Length, otherwise the number of bytes kept, so that it doesn't
+    depend on the chunks it was received in (the rest of a body may never end, e.g., a stream).
+    A complete response gives its connection back to the pool, while a truncated one closes it.
+    """
+    buffer = bytearray()
+    truncated = False
+    size = 0
+    for chunk in response.iter_content(onectf.impl.constants.body_chunk_size):
+        size += len(chunk)
+        if max_body is not None and len(buffer) + len(chunk) > max_body:
+            buffer += chunk[:max_body - len(buffer)]
+            truncated = True
+            break
+        buffer += chunk
+    if truncated:
+        length = body_length(response.headers)
+        size = len(buffer) if length is None else length
+    # urllib3 counts the bytes read on the wire, before decompression
+    wire_size = response.raw.tell() if hasattr(response.raw, 'tell') else None
+    response.close()
+    return Response(response.status_code, response.headers, response.url, bytes(buffer), truncated, size, wire_size)
+
+
+class ResponseContent:
+    def __init__(self, response, output_format):
+        """
+        The body of a response converted to the output format, and measured on demand.
+        Nothing is decoded or converted until a rule or the output reads one of the properties.
+        :param response: a requests.Response (or any object with 'text' and 'json()')
+        :param output_format: raw, html (converted to text) or json (pretty-printed)
+        """
+        self.response = response
+        self.format = output_format
+
+    @functools.cached_property
+    def _converted(self):
+        if self.format == "json" and self.response.text != '':
+            return json.dumps(self.response.json(), indent=2)
+        content = self.response.text
+        if self.format == "html":
+            content = html2text.html2text(content)
+        return content
+
+    @functools.cached_property
+    def content(self):
+        if self.format == "json" and self.response.text != '':
+            return self._converted
+        return self._converted.replace("\n\n", "\n")
+
+    @functools.cached_property
+    def lines(self):
+        return len(self._converted.splitlines())
+
+    @functools.cached_property
+    def words(self):
+        return len(self._converted.split())
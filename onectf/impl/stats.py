@@ -0,0 +1,143 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+import onectf.impl.constants
+
+# Shared by all stats (a lock cannot be deep-copied)
+stats_lock = threading.Lock()
+
+
+def percentile(values, ratio):
+    """The value below which 'ratio' of the sorted 'values' are found."""
+    if len(values) == 0:
+        return None
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f'{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}'
+
+
+class Stats:
+    def __init__(self, show=False, path=None, interval=onectf.impl.constants.stats_interval):
+        """
+        Throughput of a run: requests per second, progress and ETA, in-flight requests,
+        latency percentiles (over the last requests), and responses and errors by class.
+        :param show: print a stats line periodically (on stderr, so that the results can be piped)
+        :param path: write the stats periodically into this JSON file
+        """
+        self.show = show
+        self.path = path
+        self.interval = interval
+        self.total = None
+        self.completed = 0
+        self.in_flight = 0
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+        self.latencies = collections.deque(maxlen=onectf.impl.constants.stats_latency_samples)
+        self.started = time.monotonic()
+        self._stopped = None
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.show or self.path is not None
+
+    def start(self, total=None):
+        """
+        Start the clock, and the thread reporting the stats (if enabled).
+        The requests recorded before (e.g., the calibration) are not counted.
+        """
+        with stats_lock:
+            self.total = total
+            self.started = time.monotonic()
+            self.completed = 0
+            self.statuses.clear()
+            self.errors.clear()
+            self.latencies.clear()
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def begin(self):
+        with stats_lock:
+            self.in_flight += 1
+
+    def record(self, latency, status_code=None, error=None, started=True):
+        """
+        :param error: the class of the exception raised by the request, if any
+        :param started: whether begin() was called for this request
+        """
+        with stats_lock:
+            if started:
+                self.in_flight -= 1
+            self.completed += 1
+            self.latencies.append(latency)
+            if error is not None:
+                self.errors[error.__name__] += 1
+            elif status_code is not None:
+                self.statuses[f'{status_code // 100}xx'] += 1
+
+    def close(self):
+        """Stop the thread and report the final stats."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self._report()
+
+    def snapshot(self):
+        with stats_lock:
+            completed = self.completed
+            latencies = sorted(self.latencies)
+            snapshot = {
+                "elapsed": round(time.monotonic() - self.started, 3),
+                "completed": completed,
+                "total": self.total,
+                "in_flight": self.in_flight,
+                "statuses": dict(self.statuses),
+                "errors": dict(self.errors),
+            }
+        snapshot["rate"] = round(completed / snapshot["elapsed"], 2) if snapshot["elapsed"] > 0 else 0
+        snapshot["eta"] = None
+        if self.total is not None and snapshot["rate"] > 0:
+            snapshot["eta"] = round(max(0, self.total - completed) / snapshot["rate"], 1)
+        snapshot["latency"] = {name: percentile(latencies, ratio) for name, ratio in [('p50', 0.5), ('p90', 0.9), ('p99', 0.99)]}
+        return snapshot
+
+    def line(self):
+        snapshot = self.snapshot()
+        progress = f'{snapshot["completed"]}' if snapshot["total"] is None else \
+            f'{snapshot["completed"]}/{snapshot["total"]} ({snapshot["completed"] * 100 / max(1, snapshot["total"]):.1f}%)'
+        line = f'[*] {progress} requests, {snapshot["rate"]:.1f} req/s'
+        if snapshot["eta"] is not None:
+            line += f', ETA {format_duration(snapshot["eta"])}'
+        line += f', in-flight {snapshot["in_flight"]}'
+        if snapshot["latency"]["p50"] is not None:
+            line += ', latency ' + ' '.join(f'{name} {value:.3f}s' for name, value in snapshot["latency"].items())
+        counters = {**snapshot["statuses"], **snapshot["errors"]}
+        if counters:
+            line += ', ' + ' '.join(f'{name}={count}' for name, count in counters.items())
+        return line
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._report()
+
+    def _report(self):
+        if self.show:
+            print(self.line(), file=sys.stderr, flush=True)
+        if self.path is not None:
+            # Write then rename, so that a reader never sees a truncated file
+            temporary_path = self.path + '.tmp'
+            with open(temporary_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temporary_path, self.path)
@@ -0,0 +1,96 @@
+import re
+import urllib.parse
+
+
+class StringTemplate:
+    def __init__(self, string, keywords, encode=None):
+        """
+        A string compiled once into static segments, and slots filled with the words.
+        Rendering only concatenates the segments, so a template is shared by all the workers.
+        :param keywords: the keywords replaced by the words (the n-th word fills the slots of the n-th keyword)
+        :param encode: function applied to the words before filling the slots
+        """
+        self.encode = encode
+        self.static = []
+        self.slots = []
+        if keywords:
+            # the longest keywords first, so that 'FUZZ' never hides 'FUZZ2'
+            pattern = re.compile('|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)))
+            start = 0
+            for match in pattern.finditer(string):
+                self.static.append(string[start:match.start()])
+                self.slots.append(keywords.index(match.group(0)))
+                start = match.end()
+            string = string[start:]
+        self.static.append(string)
+        self.static = tuple(self.static)
+        self.slots = tuple(self.slots)
+
+    @classmethod
+    def from_segments(cls, prefix, suffix, encode=None):
+        """A template with a single slot (filled with the first word) between 'prefix' and 'suffix'."""
+        template = cls('', [], encode)
+        template.static = (prefix, suffix)
+        template.slots = (0,)
+        return template
+
+    @classmethod
+    def for_query_parameter(cls, url, name):
+        """The URL with the value of the query parameter 'name' replaced by a slot (URL-encoded)."""
+        parsed_url = urllib.parse.urlparse(url)
+        query_params = urllib.parse.parse_qs(parsed_url.query)
+        query_params[name] = None
+        before, after = [], []
+        pairs = before
+        for key, values in query_params.items():
+            if key == name:
+                pairs = after
+            else:
+                pairs.append(urllib.parse.urlencode({key: values}, doseq=True))
+        prefix = urllib.parse.urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, parsed_url.params,
+                                          '&'.join(before + [urllib.parse.quote_plus(name) + '=']), ''))
+        suffix = ''.join('&' + pair for pair in after)
+        if parsed_url.fragment:
+            suffix += '#' + parsed_url.fragment
+        return cls.from_segments(prefix, suffix, urllib.parse.quote_plus)
+
+    def render(self, words):
+        if len(self.slots) == 0:
+            return self.static[0]
+        encode = self.encode
+        parts = [self.static[0]]
+        for index, static in zip(self.slots, self.static[1:]):
+            parts.append(words[index] if encode is None else encode(words[index]))
+            parts.append(static)
+        return ''.join(parts)
+
+
+class DictTemplate:
+    def __init__(self, items, keywords):
+        """The values of a dictionary (headers, cookies, body) compiled into templates."""
+        self.items = items
+        self.templates = {key: StringTemplate(value, keywords) for key, value in items.items()}
+        self.slots = tuple(slot for template in self.templates.values() for slot in template.slots)
+
+    def render(self, words):
+        # the dictionary is shared when no value depends on the words
+        if len(self.slots) == 0:
+            return self.items
+        return {key: template.render(words) for key, template in self.templates.items()}
+
+
+class RequestTemplate:
+    def __init__(self, url, headers, cookies, body, keywords):
+        """
+        A request compiled once: the URL, the headers, the cookies and the body are templates.
+        :param url: a URL, or a StringTemplate
+        """
+        self.url = url if isinstance(url, StringTemplate) else StringTemplate(url, keywords)
+        self.headers = DictTemplate(headers, keywords)
+        self.cookies = DictTemplate(cookies, keywords)
+        self.body = DictTemplate(body, keywords)
+        self.slots = set(self.url.slots + self.headers.slots + self.cookies.slots + self.body.slots)
+
+    def render(self, words):
+        """Returns the URL, the headers, the cookies and the body, with one word per keyword."""
+        return self.url.render(words), self.headers.render(words), self.cookies.render(words), self.body.render(words)
@@ -1,15 +1,76 @@
+import queue
 import threading
 
+import onectf.impl.constants
 
-def start_threads(worker_function, args, target):
+
+def read_wordlist(path):
+    """
+    Lazily read a wordlist, one stripped word at a time.
+    The file is opened immediately, so a missing wordlist is reported before any worker is started.
+    """
+    file = open(path, 'r')
+    return _read_lines(file)
+
+
+def _read_lines(file):
+    with file:
+        for line in file:
+            yield line.strip()
+
+
+def count_words(path):
+    """Number of words of a wordlist, counting the lines by chunks without decoding them."""
+    count = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    return count + (last != b'\n')
+
+
+def combine_wordlists(sources, mode):
+    """
+    Lazily combine several wordlists into tuples holding one word of each wordlist.
+    * pitchfork: the n-th word of each wordlist, until the shortest wordlist ends
+    * clusterbomb: every combination, the inner wordlists are read again for each word of the outer ones
+    :param sources: functions returning a new iterator over each wordlist
+    """
+    if mode == 'pitchfork':
+        return zip(*[source() for source in sources])
+    return _cartesian_product(sources)
+
+
+def _cartesian_product(sources):
+    # unlike itertools.product, the wordlists are never loaded in memory
+    if len(sources) == 0:
+        yield ()
+        return
+    for word in sources[0]():
+        for words in _cartesian_product(sources[1:]):
+            yield (word,) + words
+
+
+def new_queue(args) -> queue.Queue:
+    """A bounded queue: the producer waits for the workers instead of loading the whole wordlist."""
+    return queue.Queue(maxsize=args.threads * onectf.impl.constants.queue_size_per_thread)
+
+
+def start_threads(worker_function, args, target, words=()):
     # Start worker threads
     threads = []
     threads_range = range(args.threads)
     for _ in threads_range:
-        t = threading.Thread(target=worker_function, args=(args,))
+        # Daemon threads do not prevent the program from exiting on CTRL+C
+        t = threading.Thread(target=worker_function, args=(args,), daemon=True)
         t.start()
         threads.append(t)
 
+    # Feed the workers (blocks while the queue is full)
+    for word in words:
+        target.put(word)
+
     # Wait for all tasks in the queue to be processed
     target.join()
 
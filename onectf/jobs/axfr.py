@@ -1,22 +1,29 @@
 import argparse
-import queue
 import dns.resolver
 
 import onectf.impl.core
 import onectf.impl.worker
+import onectf.jobs.utils.parser_utils
 
 
 def run(parser: argparse.ArgumentParser, axfr_parser: argparse.ArgumentParser):
     axfr_parser.add_argument('-D', dest='domain', help='The target domain.', required=True)
     axfr_parser.add_argument('-w', dest='wordlist', help='Wordlist of subdomains.', required=True)
-    axfr_parser.add_argument('-t', metavar='threads', dest='threads', default=10, help='Number of threads (default=%(default)s).')
+    axfr_parser.add_argument('-t', metavar='threads', dest='threads', type=int, default=10, help='Number of threads (default=%(default)s).')
     axfr_parser.add_argument('-r', dest='resolver', help='IP address of the DNS server queried.', required=True)
+    onectf.jobs.utils.parser_utils.add_rate_options(axfr_parser)
+    onectf.jobs.utils.parser_utils.add_stats_options(axfr_parser)
     args = parser.parse_args()
     args = DNSProgramData(args)
+    # One zone transfer is attempted per word and nameserver
+    args.stats.start(onectf.impl.worker.count_words(args.wordlist) * len(args.resolver.nameservers)
+                     if args.stats.enabled else None)
     try:
-        onectf.impl.worker.start_threads(execute_worker_task, args, args.words_queue)
+        onectf.impl.worker.start_threads(execute_worker_task, args, args.words_queue, args.words)
     except KeyboardInterrupt:
         print()
+    finally:
+        args.stats.close()
 
 
 def execute_worker_task(args):
@@ -36,14 +43,11 @@ class DNSProgramData(onectf.impl.core.BaseProgramData):
         super().__init__(args)
 
         # Create a queue to hold words from the wordlist
-        with open(args.wordlist, 'r') as file:
-            self.__words__ = file.readlines()
-        self.words_queue = queue.Queue()
-        words = [word.strip() for word in self.__words__]
-        for word in words:
-            self.words_queue.put(word)
+        self.words = onectf.impl.worker.read_wordlist(args.wordlist)
+        self.words_queue = onectf.impl.worker.new_queue(self)
 
         # Save parameters
+        self.wordlist = args.wordlist
         self.domain = args.domain
         self.resolver = dns.resolver.Resolver()
         self.resolver.nameservers = [args.resolver]
@@ -52,9 +56,10 @@ class DNSProgramData(onectf.impl.core.BaseProgramData):
 def do_job(args, word):
     target = word + '.' + args.domain
     for nameserver in args.resolver.nameservers:
-        try:
-            response = dns.query.xfr(nameserver, target)
-            dns.zone.from_xfr(response)
-            print(f'[*] Found valid subdomain {target} using {nameserver}')
-        except dns.xfr.TransferError:
-            pass
+        with args.limiter.slot(nameserver):
+            try:
+                response = dns.query.xfr(nameserver, target)
+                dns.zone.from_xfr(response)
+                print(f'[*] Found valid subdomain {target} using {nameserver}')
+            except dns.xfr.TransferError:
+                pass
@@ -1,21 +1,44 @@
 import argparse
+import functools
 import json
 import logging
 import os.path
+import pickle
 import re
+import tempfile
+import time
 
 import colorama
+import lxml.etree
 import scrapy
 import scrapy.crawler
+import scrapy.utils.response
 import urllib.parse
 import threading
 
+import onectf.impl.console
+import onectf.impl.constants
 import onectf.impl.core
+import onectf.impl.endpoints
+import onectf.impl.frontier
+import onectf.impl.output
 import onectf.impl.worker
 import onectf.jobs.utils.parser_utils
 
 set_lock = threading.Lock()
 
+# The URLs that are not flagged as suspicious
+known_url_regex = re.compile('.*(/|html|php|js|css)$')
+# A link with a scheme and a host, whose absolute URL doesn't depend on the page
+absolute_link_regex = re.compile('^[a-zA-Z][a-zA-Z0-9+.-]*://')
+# Removed by urllib.parse before parsing a URL
+url_leading_characters = ''.join(chr(c) for c in range(33))
+resource_types = ["css", "js", "pdf", "images"]
+# The attribute holding the URL of a link (<a>) or a resource
+link_attributes = {'a': 'href', 'link': 'href', 'img': 'src', 'script': 'src', 'video': 'src', 'source': 'src', 'audio': 'src'}
+# The key of each type of finding in the results
+finding_keys = {'link': 'links', 'external': 'external', 'email': 'emails', 'comment': 'comments', 'endpoint': 'endpoints'}
+
 
 def run(parser: argparse.ArgumentParser, crawl_parser: argparse.ArgumentParser):
     http_options = crawl_parser.add_argument_group("HTTP OPTIONS")
@@ -30,6 +53,10 @@ def run(parser: argparse.ArgumentParser, crawl_parser: argparse.ArgumentParser):
     general_options.add_argument('-t', metavar='threads', dest='threads', default=10,
                                  help='Number of threads (default=%(default)s).')
     onectf.jobs.utils.parser_utils.add_verbose_options(general_options)
+    onectf.jobs.utils.parser_utils.add_stats_options(general_options)
+    general_options.add_argument('--state-dir', metavar='directory', dest='state_dir',
+                                 help='Save the state of the crawl in this directory, to resume an interrupted crawl, '
+                                      'and only download the pages that changed when crawling again.')
 
     output_options.add_argument('--external', dest='external', action='store_true',
                                 help='Show external URLs in the list of URLs.')
@@ -38,6 +65,9 @@ def run(parser: argparse.ArgumentParser, crawl_parser: argparse.ArgumentParser):
     output_options.add_argument('--emails', dest='print_emails', action='store_true',
                                 help='Display emails.')
     output_options.add_argument('-o', metavar='output', dest='output_file', help='Write the output to a file.')
+    output_options.add_argument('-of', dest='output_format', default='json', choices=['json', 'jsonl'],
+                                help='Format of the output file: the findings at the end (json), '
+                                     'or each finding when it is found (jsonl) (default: %(default)s).')
 
     args = parser.parse_args()
 
@@ -51,12 +81,20 @@ def run(parser: argparse.ArgumentParser, crawl_parser: argparse.ArgumentParser):
 class CrawlerProgramData(onectf.impl.core.HttpProgramData):
     def __init__(self, args):
         args.method = 'GET'
+        args.raw_request = None
         args.body = None
         args.nr = False
         args.ssl_verify = False
+        args.pool_size = None
+        args.keep_alive = True
+        args.rate = None
+        args.host_rate = None
+        args.adaptive = False
         super().__init__(args)
 
         self.output_file = args.output_file
+        self.output_format = args.output_format
+        self.state_dir = os.path.expanduser(args.state_dir) if args.state_dir else None
         self.start_urls = []
         self.start_urls.append(self.url)
         self.print_comments = args.print_comments
@@ -73,13 +111,212 @@ class CrawlerProgramData(onectf.impl.core.HttpProgramData):
                     self.start_urls.append(base_endpoint + raw_endpoint[1:])
 
 
-def compute_absolute_url(response, link):
+def join_url(base_url, link):
+    """
+    The absolute URL of a link (without the fragment), its netloc, and the URL of its folder.
+    The same links are found on most pages, so the results are cached by the part of the page URL they depend on.
+    """
+    return join_link(link_context(base_url, link), link)
+
+
+@functools.lru_cache(maxsize=onectf.impl.constants.url_cache_size)
+def page_contexts(base_url):
+    """The origin and the folder of a page URL."""
+    parsed_url = urllib.parse.urlsplit(base_url)
+    if not parsed_url.scheme or not parsed_url.netloc:
+        return base_url, base_url
+    folder = parsed_url.path.rsplit('/', 1)[0] + '/'
+    return f'{parsed_url.scheme}://{parsed_url.netloc}/', f'{parsed_url.scheme}://{parsed_url.netloc}{folder}'
+
+
+def link_context(base_url, link):
+    """
+    The part of the page URL that the absolute URL of a link depends on: nothing for 'https://host/a',
+    the origin for '/a' or '//host/a', the folder for 'a' or '../a', and the whole URL for '?a', '#a' or ''.
+    """
+    stripped = link.lstrip(url_leading_characters)
+    if absolute_link_regex.match(stripped):
+        return None
+    if stripped == '' or stripped[0] in '?#':
+        return base_url
+    origin, folder = page_contexts(base_url)
+    return origin if stripped[0] == '/' else folder
+
+
+@functools.lru_cache(maxsize=onectf.impl.constants.url_cache_size)
+def join_link(context, link):
+    """Same as join_url, given the context of the link (see link_context)."""
     parsed_link = urllib.parse.urlparse(link)
     if not parsed_link.scheme:
-        link = response.urljoin(link)
-        parsed_link = urllib.parse.urlparse(link)
-    link = urllib.parse.urlunparse(parsed_link._replace(fragment=""))
-    return link, not urllib.parse.urlparse(link).netloc == urllib.parse.urlparse(response.url).netloc
+        parsed_link = urllib.parse.urlparse(urllib.parse.urljoin(context, link))
+    absolute_url = urllib.parse.urlunparse(parsed_link._replace(fragment=""))
+    return absolute_url, parsed_link.netloc, truncated_file_url(absolute_url)
+
+
+def extract_links(root, with_comments=False):
+    """
+    Walk the parsed document once, and returns the links (<a>), the resources (<img>, <script>, etc.),
+    the 'onclick' attributes, the inline scripts, and the comments (if 'with_comments') in the order of the document.
+    :return: a list of (type, value) with type among 'a', 'resource', 'onclick', 'script' and 'comment'
+    """
+    found = []
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            if with_comments and tag is lxml.etree.Comment:
+                found.append(('comment', lxml.etree.tostring(element, method='html', encoding='unicode', with_tail=False)))
+            continue
+        attribute = link_attributes.get(tag)
+        if attribute is not None:
+            value = element.get(attribute)
+            if value is not None:
+                found.append(('a' if tag == 'a' else 'resource', value))
+            elif tag == 'script' and element.text:
+                found.append(('script', element.text))
+        onclick = element.get('onclick')
+        if onclick is not None:
+            found.append(('onclick', onclick))
+    return found
+
+
+class CrawlState:
+    def __init__(self, directory):
+        """
+        The state of a crawl saved in --state-dir:
+        * jobs: the pending requests (scrapy JOBDIR)
+        * httpcache: the responses, revalidated with a conditional request (ETag, Last-Modified)
+        * frontier.pickle: the URLs already seen, saved periodically and removed when the crawl is finished
+        * findings.jsonl: the findings, continued when resuming
+        A crawl is resumed when the frontier of an interrupted crawl exists, otherwise,
+        every page is requested again (and only downloaded if it changed).
+        """
+        self.directory = directory
+        self.frontier_path = os.path.join(directory, 'frontier.pickle')
+        self.findings_path = os.path.join(directory, 'findings.jsonl')
+        self.resumed = os.path.exists(self.frontier_path)
+        self.last_save = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def settings(self):
+        return {
+            'JOBDIR': os.path.join(self.directory, 'jobs'),
+            'HTTPCACHE_ENABLED': True,
+            'HTTPCACHE_DIR': os.path.abspath(os.path.join(self.directory, 'httpcache')),
+            'HTTPCACHE_POLICY': 'scrapy.extensions.httpcache.RFC2616Policy',
+        }
+
+    def load_frontier(self):
+        if not self.resumed:
+            return onectf.impl.frontier.UrlFrontier()
+        with open(self.frontier_path, 'rb') as f:
+            frontier = pickle.load(f)
+        logging.warning(f"[*] Resuming the crawl after {len(frontier)} URLs.")
+        return frontier
+
+    def save(self, frontier, findings, force=False):
+        if not force and time.monotonic() - self.last_save < onectf.impl.constants.checkpoint_interval:
+            return
+        self.last_save = time.monotonic()
+        # the findings of the pages already crawled are saved before the frontier
+        findings.stream.flush()
+        # Write then rename, so that a killed crawl never leaves a truncated state
+        temporary_path = self.frontier_path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(frontier, f)
+        os.replace(temporary_path, self.frontier_path)
+
+    def finish(self):
+        if os.path.exists(self.frontier_path):
+            os.remove(self.frontier_path)
+
+
+class CrawlFindings:
+    def __init__(self, output_file=None, output_format='json', stream_path=None, resumed=False):
+        """
+        The findings of the crawler (URLs, resources, comments and emails). A finding is written into
+        a JSONL stream and printed when it is found, and it is only kept as a 64-bit hash to skip duplicates.
+        The stream is the output file in jsonl, the 'stream_path' (e.g., in the state directory),
+        or a temporary file that is removed when closed. The summary is read back from the stream.
+        :param resumed: continue the stream of an interrupted crawl
+        """
+        self.output_file = output_file
+        self.output_format = output_format
+        self.console = onectf.impl.console.Console()
+        self.console.start()
+        self.seen = set()
+        self.counts = {}
+        self.temporary = False
+        if output_file is not None and output_format == 'jsonl':
+            self.path = output_file
+        elif stream_path is not None:
+            self.path = stream_path
+        else:
+            fd, self.path = tempfile.mkstemp(prefix='onectf-crawl-', suffix='.jsonl')
+            os.close(fd)
+            self.temporary = True
+        resumed = resumed and os.path.exists(self.path)
+        if resumed:
+            for finding in self.read():
+                self.seen.add(onectf.impl.frontier.hash64(finding["type"] + '\0' + finding["value"]))
+                self.counts[finding["type"]] = self.counts.get(finding["type"], 0) + 1
+        self.stream = onectf.impl.output.ResultWriter(self.path, 'jsonl', append=resumed)
+        # opened now, so that the findings of a previous crawl are never read back
+        self.stream.start()
+
+    def add(self, finding_type, value, source):
+        key = onectf.impl.frontier.hash64(finding_type + '\0' + value)
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self.counts[finding_type] = self.counts.get(finding_type, 0) + 1
+        self.stream.write({"type": finding_type, "value": value, "source": source})
+
+        if finding_type in ['link', 'external']:
+            if not known_url_regex.match(value) and "?" not in value:
+                self.console.print(colorama.Fore.GREEN + '[!] ' + colorama.Style.BRIGHT +
+                                   f'Found suspicious URL {value}' + colorama.Style.RESET_ALL)
+            else:
+                self.console.print(f'[*] Found URL {value}')
+        elif finding_type in ['comment', 'email', 'endpoint']:
+            self.console.print(f'[*] Found {finding_type} {value}')
+
+    def summary(self):
+        """Read the findings back from the stream (same structure as the JSON output)."""
+        self.stream.flush()
+        results = {
+            'emails': set(),
+            'links': set(),
+            'external': set(),
+            'comments': set(),
+            'endpoints': set(),
+            'resources': {resource_type: set() for resource_type in resource_types}
+        }
+        for finding in self.read():
+            if finding["type"] in resource_types:
+                results['resources'][finding["type"]].add(finding["value"])
+            else:
+                results[finding_keys[finding["type"]]].add(finding["value"])
+        return results
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self):
+        """Close the stream, write the JSON output, and returns the summary."""
+        self.console.close()
+        results = self.summary()
+        self.stream.close()
+        if self.output_file is not None and self.output_format == 'json':
+            with open(self.output_file, 'w') as f:
+                json.dump({key: sorted(value) if isinstance(value, set) else {k: sorted(v) for k, v in value.items()}
+                           for key, value in results.items()}, f, indent=4)
+        if self.temporary and os.path.exists(self.path):
+            os.remove(self.path)
+        return results
 
 
 class CustomCrawler(scrapy.Spider):
@@ -88,167 +325,145 @@ class CustomCrawler(scrapy.Spider):
     def __init__(self, crawler_args: CrawlerProgramData, *args, **kwargs):
         super(CustomCrawler, self).__init__(*args, **kwargs)
         self.args = crawler_args
+        self.miner = onectf.impl.endpoints.EndpointMiner()
         self.email_regex = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
         self.location_href_regex = re.compile(r'location\.href\s*=\s*[\'"]([^\'"]+)[\'"]')
-        self.results = {
-            'emails': set(),
-            'links': set(),
-            'external': set(),
-            'comments': set(),
-            'resources': {
-                "css": set(),
-                "js": set(),
-                "pdf": set(),
-                "images": set(),
-            }
-        }
-        self.visited_urls = set()
+        # 'state' is used by scrapy (JOBDIR)
+        self.crawl_state = CrawlState(crawler_args.state_dir) if crawler_args.state_dir else None
+        if self.crawl_state is None:
+            self.findings = CrawlFindings(crawler_args.output_file, crawler_args.output_format)
+            self.frontier = onectf.impl.frontier.UrlFrontier()
+        else:
+            self.findings = CrawlFindings(crawler_args.output_file, crawler_args.output_format,
+                                          self.crawl_state.findings_path, self.crawl_state.resumed)
+            self.frontier = self.crawl_state.load_frontier()
 
     def start_requests(self):
+        self.args.stats.start()
         for url in self.args.start_urls:
-            yield scrapy.Request(url, callback=self.parse)
+            if self.frontier.add(url):
+                yield scrapy.Request(url, callback=self.parse, errback=self.on_error, dont_filter=True)
+
+    @property
+    def results(self):
+        return self.findings.summary()
 
-    def add_result(self, external, absolute_url, truncated_url):
+    def add_result(self, external, absolute_url, truncated_url, source):
         if external:
-            self.results['external'].add(absolute_url)
+            if self.args.external:
+                self.findings.add('external', absolute_url, source)
             return
 
-        key_abs, key_trunc = 'links', 'links'
         root, ext = os.path.splitext(absolute_url)
         if ext:
             ext = ext[1:]
             if ext in ['png', 'jpg', 'gif']:
                 ext = 'images'
 
-        if ext and ext in self.results['resources']:
-            self.results['resources'][ext].add(absolute_url)
-            self.results[key_trunc].add(truncated_url)
-            return
-
-        self.results[key_abs].add(absolute_url)
-        self.results[key_trunc].add(truncated_url)
+        self.findings.add(ext if ext in resource_types else 'link', absolute_url, source)
+        self.findings.add('link', truncated_url, source)
+
+    def follow(self, response, base_url, netloc, link):
+        """Queue the link and its folder (once per page), and save them in the results."""
+        absolute_url, link_netloc, truncated_url = join_url(base_url, link)
+        external = not link_netloc == netloc
+        if not external:
+            for url in [absolute_url, truncated_url]:
+                # the frontier replaces the duplicate filter of scrapy
+                if self.frontier.add(url):
+                    yield response.follow(url, callback=self.parse, errback=self.on_error, dont_filter=True)
+        self.add_result(external, absolute_url, truncated_url, response.url)
+
+    def follow_endpoints(self, response, base_url, netloc, data):
+        """Queue the endpoints found in a script (bytes)."""
+        for endpoint in self.miner.mine(data):
+            absolute_url, endpoint_netloc, _ = join_url(base_url, endpoint)
+            if endpoint_netloc == netloc:
+                self.findings.add('endpoint', absolute_url, response.url)
+            yield from self.follow(response, base_url, netloc, endpoint)
+
+    def record(self, latency, status_code=None, error=None):
+        # scrapy schedules the requests, so the in-flight requests are the ones being downloaded
+        if getattr(self, 'crawler', None) is not None and self.crawler.engine is not None:
+            self.args.stats.in_flight = len(self.crawler.engine.downloader.active)
+        self.args.stats.record(latency, status_code, error, started=False)
+
+    def on_error(self, failure):
+        self.record(0, error=failure.type)
+        logging.debug(f'[ERROR] {failure.request.url}: {failure.value}')
 
     def parse(self, response, **kwargs):
-        self.visited_urls.add(response.url)
+        self.record(response.meta.get('download_latency', 0) if response.request is not None else 0, response.status)
+        # a redirection was followed, the final URL is not fetched again
+        self.frontier.add(response.url)
+        if self.crawl_state is not None:
+            self.crawl_state.save(self.frontier, self.findings)
+
+        content_type = response.headers.get('Content-Type', b'').decode('utf-8', 'replace').lower()
+        url = response.url
+
+        # The endpoints of a script are relative to the page loading it, so the target URL is used
+        if is_script(url, content_type):
+            started = time.perf_counter()
+            yield from self.follow_endpoints(response, self.args.url, urllib.parse.urlparse(self.args.url).netloc, response.body)
+            logging.debug(f'[*] Mined {url} ({len(response.body)} bytes) in {(time.perf_counter() - started) * 1000:.1f} ms')
+            return
 
         # Patch to skip files that we can't read
         # (we can still look for emails/etc. even if it's not a HTML file)
-        if not response.headers.get('Content-Type', '').decode('utf-8').startswith('text'):
+        if not content_type.startswith('text'):
             return
 
-        url = response.url
         logging.info(
             colorama.Fore.GREEN + '[+] ' + colorama.Style.BRIGHT + \
             f'Crawl {url}' + \
             colorama.Fore.RESET
         )
 
-        # Parse links
-        links = response.css('a::attr(href)').getall()
-        for link in links:
-            if link.startswith("mailto:"):
-                continue
-            absolute_url, external = compute_absolute_url(response, link)
-            if not external and absolute_url not in self.visited_urls:
-                self.visited_urls.add(response.url)
-                yield response.follow(absolute_url, callback=self.parse)
-            truncated_url = truncated_file_url(absolute_url)
-            if not external and truncated_url not in self.visited_urls:
-                self.visited_urls.add(response.url)
-                yield response.follow(truncated_url, callback=self.parse)
-            self.add_result(external, absolute_url, truncated_url)
-
-        # Parse resource links
-        links = response.css('link::attr(href), img::attr(src), script::attr(src), video::attr(src), '
-                             'source::attr(src), audio::attr(src)').getall()
-        for link in links:
-            absolute_url, external = compute_absolute_url(response, link)
-            if not external and absolute_url not in self.visited_urls:
-                self.visited_urls.add(response.url)
-                yield response.follow(absolute_url, callback=self.parse)
-            truncated_url = truncated_file_url(absolute_url)
-            if not external and truncated_url not in self.visited_urls:
-                self.visited_urls.add(response.url)
-                yield response.follow(truncated_url, callback=self.parse)
-            self.add_result(external, absolute_url, truncated_url)
-
-        # Parse dynamic links
-        links = response.css('*::attr(onclick)').getall()
-        for link in links:
-            match = self.location_href_regex.match(link)
-            if match:
-                link = match[1]
-                absolute_url, external = compute_absolute_url(response, link)
-                if not external and absolute_url not in self.visited_urls:
-                    self.visited_urls.add(response.url)
-                    yield response.follow(absolute_url, callback=self.parse)
-                truncated_url = truncated_file_url(absolute_url)
-                if not external and truncated_url not in self.visited_urls:
-                    self.visited_urls.add(response.url)
-                    yield response.follow(truncated_url, callback=self.parse)
-                self.add_result(external, absolute_url, truncated_url)
+        # Parse links, resources, dynamic links and comments
+        started = time.perf_counter()
+        base_url = scrapy.utils.response.get_base_url(response)
+        netloc = urllib.parse.urlparse(url).netloc
+        found = extract_links(response.selector.root, self.args.print_comments)
+        for link_type, link in found:
+            if link_type == 'comment':
+                self.findings.add('comment', link, url)
+            elif link_type == 'script':
+                yield from self.follow_endpoints(response, base_url, netloc, link.encode('utf-8', 'surrogatepass'))
+            elif link_type == 'onclick':
+                match = self.location_href_regex.match(link)
+                if match:
+                    yield from self.follow(response, base_url, netloc, match[1])
+            elif not (link_type == 'a' and link.startswith("mailto:")):
+                yield from self.follow(response, base_url, netloc, link)
 
         # Parse emails
-        if self.args.print_emails:
-            emails = set(self.email_regex.findall(response.text))
-            self.results['emails'].update(emails)
+        if self.args.print_emails and '@' in response.text:
+            for email in self.email_regex.findall(response.text):
+                self.findings.add('email', email, url)
 
-        # Parse comments
-        if self.args.print_comments:
-            comments = response.xpath('//comment()').getall()
-            self.results['comments'].update(comments)
+        logging.debug(f'[*] Extracted {len(found)} links from {url} in {(time.perf_counter() - started) * 1000:.1f} ms')
 
     def closed(self, reason):
-
-        if not self.args.external:
-            self.results['external'] = set()
-
-        urls = list(self.results['external'])
-        urls.extend(list(self.results['links']))
-        urls = sorted(urls, key=url_extension)
-
-        # Convert sets to lists for JSON serialization
-        for key in self.results:
-            value = self.results[key]
-            if isinstance(value, set):
-                self.results[key] = list(value)
-            else:
-                for _key in self.results[key]:
-                    self.results[key][_key] = list(self.results[key][_key])
-
-        if self.args.output_file is not None:
-            with open(self.args.output_file, 'w') as f:
-                json.dump(self.results, f, indent=4)
-
-        comments = self.results['comments']
-        emails = self.results['emails']
-        url_list = ''
-        comments_list = '\n'.join(comments)
-        email_list = '\n'.join(emails)
-        pattern = re.compile('.*(/|html|php|js|css)$')
-
-        print(f'[*] Found {len(urls)} URLs.\n')
-        print("Found the following URLs:\n")
-        for url in urls:
-            if not pattern.match(url) and "?" not in url:
-                print(colorama.Fore.GREEN + '[!] ' + colorama.Style.BRIGHT, end="")
-                print(f'Found suspicious URL {url}')
-                print(colorama.Fore.RESET, end="")
-                url_list += '[!] ' + url + '\n'
+        self.args.stats.close()
+        if self.crawl_state is not None:
+            if reason == 'finished':
+                self.crawl_state.finish()
             else:
-                print(f'[*] Found URL {url}')
-                url_list += '[*] ' + url + '\n'
+                self.crawl_state.save(self.frontier, self.findings, force=True)
+        results = self.findings.close()
+
+        urls = results['external'] | results['links']
+        suspicious = [url for url in urls if not known_url_regex.match(url) and "?" not in url]
+        resources = sum(len(values) for values in results['resources'].values())
+        print(f'\n[*] Found {len(urls)} URLs ({len(suspicious)} suspicious), {resources} resources '
+              f'and {len(results["endpoints"])} endpoints in scripts.')
 
         if self.args.print_comments:
-            if comments_list.strip():
-                print("\nFound the following comments:\n")
-                print(comments_list)
-            else:
-                print("\nNo HTML comments.")
+            print(f'[*] Found {len(results["comments"])} comments.' if results['comments'] else "[*] No HTML comments.")
 
         if self.args.print_emails:
-            print("\nFound the following emails:\n")
-            print(email_list)
+            print(f'[*] Found {len(results["emails"])} emails.')
 
 
 # Scrapy doesn't honor the given "settings"
@@ -261,21 +476,27 @@ class ScrapyLoggingPatch(logging.StreamHandler):
         return super().emit(record)
 
 
-def url_extension(url):
-    parts = url.split('.')
-    return parts[-1].lower() if len(parts) > 1 else ''
-
-
 def do_job(args: CrawlerProgramData):
     logging.getLogger().handlers = [ScrapyLoggingPatch()]
-    process = scrapy.crawler.CrawlerProcess(settings={
+    settings = {
         'CONCURRENT_REQUESTS': args.threads,
-        'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7'
-    }, install_root_handler=False)
+        'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7',
+        # The URLs are deduplicated by the frontier of the spider
+        'DUPEFILTER_CLASS': 'scrapy.dupefilters.BaseDupeFilter',
+    }
+    if args.state_dir is not None:
+        settings.update(CrawlState(args.state_dir).settings())
+    process = scrapy.crawler.CrawlerProcess(settings=settings, install_root_handler=False)
     process.crawl(CustomCrawler, crawler_args=args)
     process.start()
 
 
+def is_script(url, content_type):
+    if 'javascript' in content_type or 'ecmascript' in content_type:
+        return True
+    return urllib.parse.urlparse(url).path.endswith('.js') and not content_type.startswith('text/html')
+
+
 def truncated_file_url(url):
     """
     Remove the file and any anchor.
@@ -1,23 +1,32 @@
 import argparse
 import json
 import logging
-import queue
+import math
+import os
 import sys
 import threading
 
-import colorama
-import requests
-import html2text
 import urllib.parse
 
+import onectf.impl.aio
+import onectf.impl.analysis
+import onectf.impl.calibration
+import onectf.impl.checkpoint
+import onectf.impl.clustering
+import onectf.impl.console
 import onectf.impl.core
+import onectf.impl.output
+import onectf.impl.response
+import onectf.impl.template
 import onectf.impl.constants
 import onectf.impl.worker
 import onectf.jobs.utils.parser_utils
 import onectf.utils.filtering
 import onectf.utils.tampering
+import onectf.utils.tampering_cache
 
-print_lock = threading.Lock()
+# Guards the clusters
+results_lock = threading.Lock()
 
 
 def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser):
@@ -27,8 +36,9 @@ def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser
     output_options = request_parser.add_argument_group("OUTPUT OPTIONS")
 
     # HTTP Options
-    http_options.add_argument("-u", dest="url", required=True, help="Target URL")
-    parameter = http_options.add_mutually_exclusive_group(required=True)
+    http_options.add_argument("-u", dest="url", help="Target URL (with -r, the scheme and host the request is sent to).")
+    http_options.add_argument("-r", dest="raw_request", help="Raw HTTP request file (e.g., saved from a proxy), fuzzing the keywords found anywhere in the request.")
+    parameter = http_options.add_mutually_exclusive_group()
     parameter.add_argument("-p", dest="param", help="Name of the injected parameter.")
     parameter.add_argument("--fuzz", dest="use_fuzzing", help="Use fuzzing instead of parameter injection.", action="store_true")
     parameter.add_argument("--json", dest="use_json", help="Send payload as JSON in the request body.", action="store_true")
@@ -37,7 +47,8 @@ def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser
     injecter = http_options.add_mutually_exclusive_group(required=True)
     injecter.add_argument("-i", dest="inject", help="Unencoded value to inject in parameter.")
     injecter.add_argument("-I", dest="inject_file", help="Unencoded file to inject in parameter.")
-    injecter.add_argument("-w", dest="inject_wordlist", help="Unencoded wordlist of values to inject in parameter.")
+    injecter.add_argument("-w", dest="inject_wordlist", action="append",
+                          help="Unencoded wordlist of values to inject in parameter. With --fuzz, use 'path:KEYWORD' and multiple -w flags to inject several keywords.")
 
     http_options.add_argument("-X", dest="method", default="GET", help="HTTP Method (default=%(default)s)")
     http_options.add_argument("-H", metavar="header", dest="headers", action="append", help="Header 'Name: Value', separated by colon. Multiple -H flags are accepted.")
@@ -45,22 +56,40 @@ def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser
 
     # PAYLOAD Options
     payload_options.add_argument("--jsonp", dest="payload", help=f"Replace '{onectf.impl.constants.injection_token}' with 'word' before sending the JSON payload.")
+    payload_options.add_argument("--mode", dest="mode", default="clusterbomb", choices=["clusterbomb", "pitchfork"],
+                                 help="How multiple wordlists are combined: every combination, or the n-th word of each wordlist (default=%(default)s).")
     payload_options.add_argument("--tamper", dest="tamper", default="aliases",
                                  help="Comma separated list of payload transformations (default=%(default)s). "
                                       f"Example values are: {', '.join(onectf.utils.tampering.tamper_known_values)}, etc.")
+    payload_options.add_argument("--tamper-lru", metavar="size", dest="tamper_lru", type=int, default=0,
+                                 help="Number of tampered words kept in memory, for wordlists with repeated words (default=%(default)s).")
+    payload_options.add_argument("--tamper-cache", metavar="directory", dest="tamper_cache", nargs="?",
+                                 const=onectf.impl.constants.tamper_cache_directory,
+                                 help="Save the tampered wordlist, and reuse it in the next runs with the same wordlist and tamper operations "
+                                      f"(default directory={onectf.impl.constants.tamper_cache_directory}).")
 
     # Matcher and Filter Options
     onectf.jobs.utils.parser_utils.add_filter_options(request_parser)
 
     # OUTPUT Options
+    onectf.jobs.utils.parser_utils.add_response_options(output_options)
     output_options.add_argument("-f", dest="format", default="html", choices=["raw", "html", "json"], help="Output format (default=%(default)s).")
-    output_options.add_argument("-o", dest="output", help="Path to a file to save the response content into.")
+    onectf.jobs.utils.parser_utils.add_output_options(output_options)
+    output_options.add_argument("--cluster", dest="cluster", action="store_true",
+                                help="Group the responses that are the same once the payload is removed, only the first response of each group is shown and saved.")
 
     # General Options
     general_options.add_argument('-k', dest='ssl_verify', default=True, action='store_false', help='Do not verify SSL certificates.')
     general_options.add_argument("--nr", "--no-redirect", action="store_true", help="Don't follow the response redirection.")
-    general_options.add_argument('-t', metavar='threads', dest='threads', default=10, help='Number of threads (default=%(default)s).')
+    general_options.add_argument('-t', metavar='threads', dest='threads', type=int, default=10, help='Number of threads, or of in-flight requests with the async engine (default=%(default)s).')
+    onectf.jobs.utils.parser_utils.add_connection_options(general_options)
+    general_options.add_argument('--engine', dest='engine', default='thread', choices=['thread', 'async'], help='Engine used with a wordlist (default=%(default)s).')
+    general_options.add_argument('--processes', metavar='processes', dest='processes', type=int, default=0, help='Number of processes converting and filtering the responses, 0 to do it in the threads sending the requests (default=%(default)s).')
+    onectf.jobs.utils.parser_utils.add_rate_options(general_options)
+    onectf.jobs.utils.parser_utils.add_resume_options(general_options)
     onectf.jobs.utils.parser_utils.add_verbose_options(general_options)
+    onectf.jobs.utils.parser_utils.add_quiet_options(general_options)
+    onectf.jobs.utils.parser_utils.add_stats_options(general_options)
 
     args = parser.parse_args()
 
@@ -72,22 +101,42 @@ def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser
         with open(args.inject_file, 'r') as f:
             payload = ['\n'.join(f.readlines())]
     else:
-        with open(args.inject_wordlist, 'r') as f:
-            payload = f.readlines()
-            use_threading = True
+        use_threading = True
 
     # Handle shared data
     args = RequestProgramData(args)
     logging.info(f'{args}\n')
+    args.console.start()
+
+    if args.auto_calibrate:
+        onectf.impl.calibration.calibrate(args, send_request)
+
+    if args.processes:
+        args.analysis = onectf.impl.analysis.AnalysisPool(args.processes, args.predicate, args.format,
+                                                          lambda word, response, result: report(args, word, response, result),
+                                                          lambda index: complete_word(args, index), args.with_content)
 
-    # Run
     if use_threading:
-        args.words = queue.Queue()
-        for word in payload:
-            args.words.put(word.strip())
-        onectf.impl.worker.start_threads(execute_worker_task, args, args.words)
-    else:
-        do_job(args, payload[0])
+        payload = args.read_words()
+    args.stats.start(args.count_words() if use_threading and args.stats.enabled else None)
+
+    # Run
+    try:
+        if use_threading and args.engine == 'async':
+            onectf.impl.aio.start_async(execute_worker_task_async, args, args.checkpoint.skip(payload))
+        elif use_threading:
+            args.words = onectf.impl.worker.new_queue(args)
+            onectf.impl.worker.start_threads(execute_worker_task, args, args.words, args.checkpoint.skip(payload))
+        else:
+            do_job(args, payload[0])
+    except KeyboardInterrupt:
+        print()
+    finally:
+        if args.analysis is not None:
+            args.analysis.close()
+        args.console.close()
+        args.stats.close()
+        args.checkpoint.save()
 
     finish_job(args)
 
@@ -95,88 +144,193 @@ def run(parser: argparse.ArgumentParser, request_parser: argparse.ArgumentParser
 def execute_worker_task(args):
     """Worker function to consume links from the queue."""
     while True:
-        word = args.words.get()
-        if word is None:
+        item = args.words.get()
+        if item is None:
             break
-        do_job(args, word)
+        index, word = item
+        do_job(args, word, index)
         args.words.task_done()
 
 
-def do_job(args, word):
+async def execute_worker_task_async(args, session, item):
+    index, word = item
+    await do_job_async(args, session, word, index)
+
+
+def complete_word(args, index):
+    """The word was tested, and its result (if any) was reported."""
+    if index is None:
+        return
+    args.console.word_done()
+    args.checkpoint.complete(index)
+
+
+def do_job(args, word, index=None):
+    """:param index: the index of the word in the wordlist, completed once its response is analyzed"""
+    try:
+        word, response = send_request(args, word)
+        handle_response(args, word, response, index)
+    except Exception as e:
+        args.console.error(f'[ERROR] {e}')
+        complete_word(args, index)
+
+
+def send_request(args, word):
+    """Inject the word and send the request, returns the injected word and the response."""
+    if args.raw_template is not None:
+        return send_raw_request(args, word)
     (word, url, headers, cookies, body_data, json_data) = args.inject_word(word)
     word = word.replace('\n', '\\n')
     word = word.replace('\r', '\\r')
+    with args.limiter.slot(urllib.parse.urlsplit(url).netloc) as slot:
+        response = args.get_session().request(args.method, url, data=body_data, headers=headers, cookies=cookies,
+                                              allow_redirects=args.allow_redirects, json=json_data, verify=args.ssl_verify,
+                                              stream=True)
+        response = onectf.impl.response.read_response(response, args.max_body)
+        slot.status_code = response.status_code
+    logging.debug(f'\nHTTP {url}, Body: {body_data}, JSON: {json_data}, '
+                  f'Received: {response.size} bytes ({response.wire_size} on the wire)\n')
+    return word, response
+
+
+def send_raw_request(args, word):
+    (word, url, method, data) = args.inject_raw_word(word)
+    word = word.replace('\n', '\\n')
+    word = word.replace('\r', '\\r')
+    with args.limiter.slot(args.raw_client.netloc) as slot:
+        response = args.raw_client.send(url, method, data, args.max_body)
+        slot.status_code = response.status_code
+    logging.debug(f'\nHTTP {url}, Request: {data}, Received: {response.size} bytes\n')
+    return word, response
+
+
+async def do_job_async(args, session, word, index=None):
     try:
-        response = requests.request(args.method, url, data=body_data, headers=headers, cookies=cookies,
-                                    allow_redirects=args.allow_redirects, json=json_data, verify=args.ssl_verify)
-        logging.debug(f'\nHTTP {url}, Body: {body_data}, JSON: {json_data}\n')
-        content, lines, words = args.parse_response_content(response)
-        res_code = response.status_code
-        res_size = int(response.headers.get('Content-Length') or 0)
-
-        # remove not matching or filtered
-        if not args.matcher.is_valid(res_code, lines, content, res_size, words):
-            return
-        if not args.filter.is_valid(res_code, lines, content, res_size, words):
-            return
-
-        with print_lock:
-            print(colorama.Fore.GREEN + '[+] ' + colorama.Style.BRIGHT, end="")
-            print(f'{word:<25} [Status: {res_code}, Size: {res_size}, Words: {words}, Lines: {lines}]\x1b[0m')
-            print(colorama.Fore.RESET)
-            logging.info(f'\nResponse Headers: \n\n{response.headers}')
-            logging.info(f'\nResponse Content: \n\n{content}')
-
-            args.results.append({
-                "word": word,
-                "status": res_code,
-                "size": res_size,
-                "words": words,
-                "lines": lines,
-                "headers": dict(response.headers),
-                "content": content
-            })
+        (word, url, headers, cookies, body_data, json_data) = args.inject_word(word)
+        word = word.replace('\n', '\\n')
+        word = word.replace('\r', '\\r')
+        # aiohttp refuses both 'data' and 'json', while requests ignores an empty 'data'
+        async with args.limiter.slot(urllib.parse.urlsplit(url).netloc) as slot:
+            async with session.request(args.method, url, data=body_data if json_data is None else None,
+                                       headers=headers, cookies=cookies, allow_redirects=args.allow_redirects,
+                                       json=json_data) as response:
+                response = await onectf.impl.aio.read_response(response, args.max_body)
+            slot.status_code = response.status_code
+        logging.debug(f'\nHTTP {url}, Body: {body_data}, JSON: {json_data}, '
+                      f'Received: {response.size} bytes ({response.wire_size} on the wire)\n')
+        handle_response(args, word, response, index)
     except Exception as e:
-        logging.error(f'[ERROR] {e}')
+        args.console.error(f'[ERROR] {e}')
+        complete_word(args, index)
+
+
+def handle_response(args, word, response, index=None):
+    if args.analysis is not None:
+        # completed by the pool, once the response is analyzed and reported
+        args.analysis.submit(word, response, index)
+        return
+    result = onectf.impl.analysis.analyze(args.predicate, args.format, response, args.with_content, word)
+    if result is not None:
+        report(args, word, response, result)
+    complete_word(args, index)
+
+
+def report(args, word, response, result):
+    # Only the first response of each cluster is shown and stored
+    if args.clusters is not None:
+        with results_lock:
+            if not args.clusters.add(word, response, result):
+                return
+    args.console.hit(word, result, response.headers)
+    if args.clusters is None and args.output is not None:
+        args.output.write(onectf.impl.output.result_entry(word, response, result))
 
 
 def finish_job(args):
+    if args.clusters is not None and len(args.clusters) > 0:
+        print(f'[*] Clusters:\n{args.clusters.summary()}')
     if args.output is not None:
-        with open(args.output, 'w') as f:
-            json.dump(args.results, f, indent=2)
+        # The clusters are bounded, they are written once complete
+        for cluster in args.clusters.results if args.clusters is not None else []:
+            args.output.write(cluster)
+        args.output.close()
 
 
 class RequestProgramData(onectf.impl.core.HttpProgramDataWithFilters):
     def __init__(self, args):
         super().__init__(args)
 
-        self.tamper = onectf.utils.tampering.TamperingHandler(args.tamper)
+        self.tamper = onectf.utils.tampering.TamperingHandler(args.tamper, args.tamper_lru)
+        self.tamper_cache = args.tamper_cache
+        self.pretampered = False
+        self.mode = args.mode
         self.format = args.format
-        self.output = args.output
-
+        self.engine = args.engine
+        self.processes = args.processes
+        self.analysis = None
+        self.console = onectf.impl.console.Console(args.quiet)
+        self.checkpoint = onectf.impl.checkpoint.Checkpoint(args.resume, args.inject_wordlist)
         self.use_fuzzing = args.use_fuzzing
         self.use_json = args.use_json
         self.use_raw = args.use_raw
-
-        self.results = []
+        self.raw_template = None
+        if self.raw_request is not None:
+            if args.param is not None or self.use_json or self.use_raw:
+                logging.error(f"[ERROR] Cannot use '-p', '--json' or '--raw' with '-r'.")
+                sys.exit(2)
+            if self.engine == 'async':
+                logging.error(f"[ERROR] Cannot use '--engine async' with '-r'.")
+                sys.exit(2)
+            self.use_fuzzing = True
+        elif args.param is None and not self.use_fuzzing and not self.use_json and not self.use_raw:
+            logging.error(f"[ERROR] One of '-p', '--fuzz', '--json' or '--raw' is required.")
+            sys.exit(2)
+
+        # Wordlists 'path' or 'path:KEYWORD'
+        self.wordlists = []
+        for value in args.inject_wordlist or []:
+            path, separator, keyword = value.rpartition(':')
+            if not separator or not keyword or os.path.exists(value):
+                path, keyword = value, 'FUZZ'
+            if not os.path.isfile(path):
+                logging.error(f'[ERROR] Wordlist not found: {path}')
+                sys.exit(2)
+            self.wordlists.append((path, keyword))
+        self.keywords = [keyword for _, keyword in self.wordlists] or ['FUZZ']
+        if len(set(self.keywords)) != len(self.keywords):
+            logging.error(f'[ERROR] Each wordlist must use a different keyword.')
+            sys.exit(2)
+        if len(self.keywords) > 1 and not self.use_fuzzing:
+            logging.error(f"[ERROR] Multiple wordlists are only supported with '--fuzz'.")
+            sys.exit(2)
+
+        # The results are written while they are found, only the (bounded) clusters are kept in memory
+        self.clusters = onectf.impl.clustering.ResponseClusters(self.checkpoint.results) if args.cluster else None
+        self.output = None
+        if args.output is not None:
+            self.output = onectf.impl.output.ResultWriter(args.output, args.output_format,
+                                                          append=self.checkpoint.resumed and not args.cluster)
+            self.checkpoint.writer = self.output
+        # the converted content is only kept when it is saved, clustered or printed (-v)
+        self.with_content = self.output is not None or self.clusters is not None or \
+            logging.getLogger().isEnabledFor(logging.INFO)
 
         self.payload = args.payload
+        # The request is compiled once, the workers only fill the slots of the templates
+        self.template = onectf.impl.template.RequestTemplate(self.url, self.headers, self.cookies, self.body, [])
+        self.payload_template = None
         if self.use_fuzzing:
-            self.param = 'FUZZ'
-            self.fuzzing_source = None
-            if "FUZZ" in self.url:
-                self.fuzzing_source = 'URL'
-            else:
-                for source, items_dict in {'HEADERS': self.headers, 'COOKIES': self.cookies, 'BODY': self.body}.items():
-                    for k, v in items_dict.items():
-                        if 'FUZZ' in v:
-                            self.fuzzing_source = source
-                            self.param = k
-                            break
-
-            if self.fuzzing_source is None:
-                logging.error(f'[ERROR] FUZZ keyword not found (checked URL, Body, Headers).')
-                sys.exit(2)
+            self.param = ', '.join(self.keywords)
+            # Each keyword is replaced everywhere it is found
+            self.template = onectf.impl.template.RequestTemplate(self.url, self.headers, self.cookies, self.body, self.keywords)
+            slots = self.template.slots
+            if self.raw_request is not None:
+                self.raw_template = self.raw_request.compile(self.keywords)
+                slots = self.raw_template.slots
+            for index, keyword in enumerate(self.keywords):
+                if index not in slots:
+                    logging.error(f'[ERROR] {keyword} keyword not found (checked URL, Body, Headers).')
+                    sys.exit(2)
         elif self.use_json:
             self.param = '<none>'
             if self.method == 'GET':
@@ -186,6 +340,7 @@ class RequestProgramData(onectf.impl.core.HttpProgramDataWithFilters):
             if self.payload is None or onectf.impl.constants.injection_token not in self.payload:
                 logging.error(f"Payload must contains the placeholder '{onectf.impl.constants.injection_token}', e.g., {{\"name\": \"{onectf.impl.constants.injection_token}\"}}.")
                 sys.exit(2)
+            self.payload_template = onectf.impl.template.StringTemplate(self.payload, [onectf.impl.constants.injection_token])
         elif self.use_raw:
             self.param = '<none>'
             if self.method == 'GET':
@@ -197,75 +352,83 @@ class RequestProgramData(onectf.impl.core.HttpProgramDataWithFilters):
         else:
             self.param = args.param
             if self.method == "GET":
-                self.__pu = urllib.parse.urlparse(self.url)
-                self.__query_params = urllib.parse.parse_qs(self.__pu.query)
+                url = onectf.impl.template.StringTemplate.for_query_parameter(self.url, self.param)
+                self.template = onectf.impl.template.RequestTemplate(url, self.headers, self.cookies, self.body, [])
 
         if not self.use_json and self.payload is not None:
             logging.warning(f'[WARNING] Ignored --payload as it is only supported with --json.')
 
+    def read_words(self):
+        """
+        The words of the wordlists, already tampered. With multiple wordlists,
+        each word is a tuple holding one word per keyword, combined according to the mode.
+        """
+        self.pretampered = True
+        sources = []
+        for path, _ in self.wordlists:
+            if self.tamper_cache is not None:
+                # The words are tampered (or read already tampered) while the wordlist is read
+                cache = onectf.utils.tampering_cache.TamperCache(self.tamper_cache, path, self.tamper)
+                sources.append(lambda path=path, cache=cache: cache.words(onectf.impl.worker.read_wordlist(path)))
+            else:
+                sources.append(lambda path=path: map(self.tamper.apply, onectf.impl.worker.read_wordlist(path)))
+        if len(sources) == 1:
+            return sources[0]()
+        return onectf.impl.worker.combine_wordlists(sources, self.mode)
+
+    def count_words(self):
+        """Number of words (or combinations of words) left to test."""
+        counts = [onectf.impl.worker.count_words(path) for path, _ in self.wordlists]
+        total = min(counts) if self.mode == 'pitchfork' else math.prod(counts)
+        return max(0, total - self.checkpoint.tested())
+
+    def _tamper_words(self, word):
+        """Returns the displayed word, and the (tampered) word of each keyword."""
+        words = word if isinstance(word, tuple) else (word,) * len(self.keywords)
+        if not self.pretampered:
+            words = self.tamper.apply_batch(words)
+        word = words[0] if len(words) == 1 else ', '.join(f'{k}={v}' for k, v in zip(self.keywords, words))
+        return word, words
+
+    def inject_raw_word(self, word):
+        """Returns the injected word, the URL, the method and the bytes of the raw request."""
+        word, words = self._tamper_words(word)
+        return (word, *self.raw_template.render(words))
+
     def inject_word(self, word):
-        word = self.tamper.apply(word)
-        body_data = self.body
-        updated_url = self.url
+        """
+        :param word: the word injected for every keyword, or a tuple with one word per keyword
+        """
+        word, words = self._tamper_words(word)
+        # Inject 'word' in URL, headers, cookies or Body (fuzzing), or in the URL parameter
+        updated_url, headers, cookies, body_data = self.template.render(words)
         json_data = None
-        headers = self.headers
-        cookies = self.cookies
 
-        # Inject 'word' in URL or in Body
-        if self.use_fuzzing:
-            if "URL" == self.fuzzing_source:
-                updated_url = updated_url.replace("FUZZ", word)
-            elif "BODY" == self.fuzzing_source:
-                body_data = self.body.copy()
-                body_data[self.param] = body_data[self.param].replace("FUZZ", word)
-            elif "HEADERS" == self.fuzzing_source:
-                headers = self.headers.copy()
-                headers[self.param] = headers[self.param].replace("FUZZ", word)
-            elif "COOKIES" == self.fuzzing_source:
-                cookies = self.cookies.copy()
-                cookies[self.param] = cookies[self.param].replace("FUZZ", word)
-            else:
-                raise Exception("Unexpected source:" + self.fuzzing_source)
-        elif self.use_json:
-            if self.payload is None:
+        # Inject 'word' in the JSON payload or in Body
+        if self.use_json:
+            if self.payload_template is None:
                 json_data = json.loads(word)
             else:
-                payload = self.payload.replace(onectf.impl.constants.injection_token, word)
-                json_data = json.loads(payload)
+                json_data = json.loads(self.payload_template.render(words))
         elif self.use_raw:
             word = urllib.parse.unquote(word)
             body_data = word
-        else:
-            if self.method == "GET":
-                self.__query_params[self.param] = [word]
-                updated_query = urllib.parse.urlencode(self.__query_params, doseq=True)
-                updated_url = urllib.parse.urlunparse(
-                    (self.__pu.scheme, self.__pu.netloc, self.__pu.path, self.__pu.params, updated_query,
-                     self.__pu.fragment))
-            else:
-                word = urllib.parse.unquote(word)
-                body_data = self.body.copy()
-                body_data[self.param] = word
+        elif not self.use_fuzzing and self.method != "GET":
+            word = urllib.parse.unquote(word)
+            body_data = self.body.copy()
+            body_data[self.param] = word
 
         return word, updated_url, headers, cookies, body_data, json_data
 
-    def parse_response_content(self, response):
-        if self.format == "json" and response.text != '':
-            content = json.dumps(response.json(), indent=2)
-            return content, len(content.splitlines()), len(content.split())
-
-        content = response.text
-        if self.format == "html":
-            content = html2text.html2text(content)
-        lines_count = len(content.splitlines())
-        words_count = len(content.split())
-        content = content.replace("\n\n", "\n")
-
-        return content, lines_count, words_count
-
     def __str__(self):
         return f"{self.__class__.__name__}(" \
                f"{super().__str__()}, " \
                f"Parameter={self.param}, " \
+               f"Mode={self.mode}, " \
+               f"Engine={self.engine}, " \
+               f"Processes={self.processes}, " \
+               f"Cluster={self.clusters is not None}, " \
+               f"Resume={self.checkpoint}, " \
+               f"Output={self.output}, " \
                f"Tamper={self.tamper}" \
                f")"
@@ -2,24 +2,25 @@ import argparse
 import binascii
 import logging
 import os
-import queue
 import sys
-import threading
 
 import colorama
-import html2text
 import pyfiglet
-import requests
+import urllib.parse
 import urllib3
 
+import onectf.impl.analysis
+import onectf.impl.calibration
+import onectf.impl.checkpoint
+import onectf.impl.console
 import onectf.impl.core
+import onectf.impl.output
+import onectf.impl.response
 import onectf.impl.constants
 import onectf.impl.worker
 import onectf.jobs.utils.parser_utils
 import onectf.utils.filtering
 
-print_lock = threading.Lock()
-
 uffuf_version = "0.3.2-unstable-dev"
 
 keyword_auto = "auto"
@@ -44,11 +45,13 @@ class UffufProgramData(onectf.impl.core.HttpProgramDataWithFilters):
         args.method = 'POST'
         super().__init__(args)
 
+        self.host = urllib.parse.urlsplit(self.url).netloc
         self.param = args.param
         self.file = args.file
         self.format = args.format
         self.should_spoof = args.should_spoof
         self.disable_fuzzing = args.disable_fuzzing
+        self.console = onectf.impl.console.Console(args.quiet)
 
         if args.wordlist is not None:
             try:
@@ -59,20 +62,34 @@ class UffufProgramData(onectf.impl.core.HttpProgramDataWithFilters):
                     self.wordlist = args.wordlist
                     self.keyword = "FUZZ"
 
-                with open(self.wordlist, 'r') as file:
-                    args.words = file.readlines()
+                self.words = onectf.impl.worker.read_wordlist(self.wordlist)
             except FileNotFoundError:
                 print(f"Error: Wordlist '{self.wordlist}' not found.")
                 sys.exit(1)
         else:
             self.keyword = "FUZZ"
             if args.word is not None:
-                args.words = [args.word]
+                self.words = [args.word.strip()]
                 self.wordlist = '<word = ' + args.word + '>'
             else:
-                args.words = ['dummy']
+                self.words = ['dummy']
                 self.wordlist = '<no fuzzing>'
 
+        # The uploaded file is already in the raw request
+        self.raw_template = None
+        if self.raw_request is not None:
+            self.raw_template = self.raw_request.compile([self.keyword])
+            self.filename = self.filetype = '<request file>'
+            if 0 not in self.raw_template.slots and not self.disable_fuzzing:
+                print(f'Error: The keyword "{self.keyword}" was not found in the request file.')
+                sys.exit(2)
+            self._init_run(args)
+            return
+
+        if self.param is None or self.file is None:
+            print(f'Error: The file parameter (-p) and the file (-F) are required without a request file (-r).')
+            sys.exit(2)
+
         try:
             with open(self.file, 'rb') as file:
                 self.file_content = file.read()
@@ -98,23 +115,17 @@ class UffufProgramData(onectf.impl.core.HttpProgramDataWithFilters):
             print(f'Error: The keyword "{self.keyword}" was not found in either the filename or the filetype.')
             sys.exit(2)
 
-        # Create a queue to hold words from the wordlist
-        self.words_queue = queue.Queue()
-        words = [word.strip() for word in args.words]
-        for word in words:
-            self.words_queue.put(word)
-
-    # fixme: factorize code
-    def parse_response_content(self, response):
-        content = response.text
-        if self.format == "html":
-            content = html2text.html2text(content)
-        res_size = int(response.headers.get('Content-Length') or 0)
-        lines_count = len(content.splitlines())
-        words_count = len(content.split())
-        content = content.replace("\n\n", "\n")
+        self._init_run(args)
 
-        return content, lines_count, words_count, res_size
+    def _init_run(self, args):
+        # Create a queue to hold words from the wordlist
+        self.words_queue = onectf.impl.worker.new_queue(self)
+        self.checkpoint = onectf.impl.checkpoint.Checkpoint(args.resume, self.wordlist)
+        # The results are written while they are found (appended when resuming)
+        self.output = None
+        if args.output is not None:
+            self.output = onectf.impl.output.ResultWriter(args.output, args.output_format, append=self.checkpoint.resumed)
+            self.checkpoint.writer = self.output
 
 
 def run(parser: argparse.ArgumentParser, uffuf_parser: argparse.ArgumentParser):
@@ -124,10 +135,11 @@ def run(parser: argparse.ArgumentParser, uffuf_parser: argparse.ArgumentParser):
 
     # HTTP Options
     http_options.add_argument("-H", metavar="header", dest="headers", action="append", help="Header 'Name: Value', separated by colon. Multiple -H flags are accepted.")
-    http_options.add_argument("-u", dest="url", required=True, help="Target URL")
+    http_options.add_argument("-u", dest="url", help="Target URL (with -r, the scheme and host the request is sent to).")
+    http_options.add_argument("-r", dest="raw_request", help="Raw HTTP upload request file (e.g., saved from a proxy), replacing -p and -F.")
     http_options.add_argument("-d", dest="body", help="Request body data.")
-    http_options.add_argument("-p", dest="param", help="Name of the file parameter.", required=True)
-    http_options.add_argument("-F", dest="file", help="Path to the file to upload.", required=True)
+    http_options.add_argument("-p", dest="param", help="Name of the file parameter.")
+    http_options.add_argument("-F", dest="file", help="Path to the file to upload.")
     http_options.add_argument("-Fn", dest="filename", default=keyword_auto, help="Name of the file to upload (default: %(default)s).")
     http_options.add_argument("-Ft", dest="filetype", default=keyword_auto, help="MIME types tested with the file (default: %(default)s).")
     http_options.add_argument("--spoof", dest="should_spoof", action="store_true", help="Modify file contents to inject the MIME type.")
@@ -138,8 +150,15 @@ def run(parser: argparse.ArgumentParser, uffuf_parser: argparse.ArgumentParser):
     verbose = general_options.add_mutually_exclusive_group()
     verbose.add_argument('-v', dest='is_info', action='store_true', help='Info verbosity level.')
     verbose.add_argument('-vv', dest='is_debug', action='store_true', help='Debug verbosity level.')
+    onectf.jobs.utils.parser_utils.add_quiet_options(general_options)
+    onectf.jobs.utils.parser_utils.add_stats_options(general_options)
+    onectf.jobs.utils.parser_utils.add_response_options(general_options)
     general_options.add_argument("-f", dest="format", default="html", choices=["raw", "html"], help="Output format (default=%(default)s).")
+    onectf.jobs.utils.parser_utils.add_output_options(general_options)
     general_options.add_argument("--nr", "--no-redirect", action="store_true", help="Don't follow the response redirection.")
+    onectf.jobs.utils.parser_utils.add_connection_options(general_options)
+    onectf.jobs.utils.parser_utils.add_rate_options(general_options)
+    onectf.jobs.utils.parser_utils.add_resume_options(general_options)
 
     # Matcher and Filter Options
     onectf.jobs.utils.parser_utils.add_filter_options(uffuf_parser)
@@ -154,10 +173,29 @@ def run(parser: argparse.ArgumentParser, uffuf_parser: argparse.ArgumentParser):
     args = parser.parse_args()
     args = UffufProgramData(args)
     logging.info(f'{args}\n')
+    args.console.start()
+
+    if args.auto_calibrate:
+        onectf.impl.calibration.calibrate(args, send_request)
 
     print_uffuf_header(args)
 
-    onectf.impl.worker.start_threads(execute_worker_task, args, args.words_queue)
+    total = None
+    if args.stats.enabled:
+        total = len(args.words) if isinstance(args.words, list) else onectf.impl.worker.count_words(args.wordlist)
+        total = max(0, total - args.checkpoint.tested())
+    args.stats.start(total)
+
+    try:
+        onectf.impl.worker.start_threads(execute_worker_task, args, args.words_queue, args.checkpoint.skip(args.words))
+    except KeyboardInterrupt:
+        print()
+    finally:
+        args.console.close()
+        args.stats.close()
+        args.checkpoint.save()
+        if args.output is not None:
+            args.output.close()
 
 
 def print_uffuf_header(args: UffufProgramData):
@@ -174,6 +212,10 @@ def print_uffuf_header(args: UffufProgramData):
             Header(s)      ::=  {args.headers}
             Cookie(s)      ::=  {args.cookies}
             File           ::=  (name: {args.filename}, type: {args.filetype}, path: {args.file})""")
+    if args.raw_request is not None:
+        print(f"            Request File   ::=  {args.raw_request}")
+    if args.output is not None:
+        print(f"            Output         ::=  {args.output}")
 
     for my_filter in [args.matcher, args.filter]:
         if my_filter.status_code is not None and my_filter.status_code != onectf.impl.constants.default_status_codes:
@@ -193,14 +235,40 @@ def print_uffuf_header(args: UffufProgramData):
 def execute_worker_task(args):
     """Worker function to consume links from the queue."""
     while True:
-        word = args.words_queue.get()
-        if word is None:
+        item = args.words_queue.get()
+        if item is None:
             break
+        index, word = item
         do_job(args, word)
+        args.console.word_done()
+        args.checkpoint.complete(index)
         args.words_queue.task_done()
 
 
 def do_job(args: UffufProgramData, word):
+    try:
+        word, response = send_request(args, word)
+        # remove not matching or filtered
+        result = onectf.impl.analysis.analyze(args.predicate, args.format, response, word=word)
+        if result is None:
+            return
+
+        args.console.hit(word, result, response.headers)
+        if args.output is not None:
+            args.output.write(onectf.impl.output.result_entry(word, response, result))
+    except Exception as e:
+        args.console.error(f'{word:<25} [Error {e}]')
+
+
+def send_request(args: UffufProgramData, word):
+    """Upload the file for this word, returns the word and the response."""
+    if args.raw_template is not None:
+        url, method, data = args.raw_template.render([word])
+        with args.limiter.slot(args.raw_client.netloc) as slot:
+            response = args.raw_client.send(url, method, data, args.max_body)
+            slot.status_code = response.status_code
+        return word, response
+
     contents = args.file_content
     filetype = args.filetype.replace(args.keyword, word)
     if args.should_spoof:
@@ -219,26 +287,10 @@ def do_job(args: UffufProgramData, word):
     }
 
     logging.debug(f'[Testing Payload For {word}] ', files)
-    try:
-        response = requests.post(args.url, data=args.body, headers=args.headers, files=files,
-                                 cookies=args.cookies, verify=args.ssl_verify, allow_redirects=args.allow_redirects)
-
-        content, lines, words, res_size = args.parse_response_content(response)
-        res_code = response.status_code
-        if res_size is not None:
-            res_size = int(res_size)
-
-        # remove not matching or filtered
-        if not args.matcher.is_valid(res_code, lines, content, res_size, words):
-            return
-        if not args.filter.is_valid(res_code, lines, content, res_size, words):
-            return
-
-        with print_lock:
-            print(colorama.Fore.GREEN + '[+] ' + colorama.Style.BRIGHT, end="")
-            print(f'{word:<25} [Status: {res_code}, Size: {res_size}, Words: {words}, Lines: {lines}]\x1b[0m')
-            print(colorama.Fore.RESET)
-            logging.info(f'\nResponse Headers: \n\n{response.headers}')
-            logging.info(f'\nResponse Content: \n\n{content}')
-    except Exception as e:
-        print(f'{word:<25} [Error {e}]')
+    with args.limiter.slot(args.host) as slot:
+        response = args.get_session().post(args.url, data=args.body, headers=args.headers, files=files,
+                                           cookies=args.cookies, verify=args.ssl_verify, allow_redirects=args.allow_redirects,
+                                           stream=True)
+        response = onectf.impl.response.read_response(response, args.max_body)
+        slot.status_code = response.status_code
+    return word, response
@@ -1,6 +1,7 @@
 import argparse
 
 import onectf.impl.constants
+import onectf.impl.output
 
 
 def add_filter_options(parser: argparse.ArgumentParser):
@@ -19,9 +20,57 @@ def add_filter_options(parser: argparse.ArgumentParser):
     filter_options.add_argument("-fr", metavar="fr", help="Filter regexp")
     filter_options.add_argument("-fs", metavar="fs", help="Filter HTTP response size")
     filter_options.add_argument("-fw", metavar="fw", help="Filter by amount of words in response")
+    filter_options.add_argument("-ac", "--auto-calibrate", dest="auto_calibrate", action="store_true", help="Send random payloads first, and filter the responses they have in common")
 
 
 def add_verbose_options(parser: argparse.ArgumentParser|object):
     verbose = parser.add_mutually_exclusive_group()
     verbose.add_argument('-v', dest='is_info', action='store_true', help='Info verbosity level.')
     verbose.add_argument('-vv', dest='is_debug', action='store_true', help='Debug verbosity level.')
+
+
+def add_quiet_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument('-q', '--quiet', dest='quiet', action='store_true', help='Only print the progress periodically, instead of each result.')
+
+
+def add_stats_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("--stats", dest="stats", action="store_true", help="Print the throughput, progress, latency and errors every few seconds (on stderr).")
+    parser.add_argument("--stats-file", metavar="path", dest="stats_file", help="Write the stats every few seconds into this JSON file.")
+
+
+def add_connection_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("--pool-size", metavar="size", dest="pool_size", type=int, help="Number of pooled connections per host (default: number of threads).")
+    parser.add_argument("--no-keep-alive", dest="keep_alive", action="store_false", help="Close the connection after each request.")
+
+
+def add_resume_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("--resume", metavar="state", dest="resume", help="Save the progress of the wordlist in this file, and skip the words already tested when it exists.")
+
+
+def add_rate_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("--rate", metavar="N/s", dest="rate", help="Maximum number of requests per second (or per minute with 'N/m').")
+    parser.add_argument("--host-rate", metavar="N/s", dest="host_rate", help="Maximum number of requests per second sent to each host.")
+    parser.add_argument("--adaptive", dest="adaptive", action="store_true", help="Adjust the number of concurrent requests to the latency and throttling (429/503) of the target, up to the number of threads.")
+
+
+def parse_size(string):
+    """Parse a size such as '512', '64K' or '10M' into bytes, '0' means no limit."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    string = string.strip().upper()
+    try:
+        if string and string[-1] in units:
+            size = int(string[:-1]) * units[string[-1]]
+        else:
+            size = int(string)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: '{string}'")
+    return size or None
+
+
+def add_response_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("--max-body", metavar="size", dest="max_body", type=parse_size, default=onectf.impl.constants.default_max_body, help="Maximum number of bytes read from each response, e.g., 512K, '0' for no limit (default: %(default)s).")
+
+
+def add_output_options(parser: argparse.ArgumentParser|object):
+    parser.add_argument("-o", dest="output", help="Path to a file to save the results into, written while they are found.")
+    parser.add_argument("-of", dest="output_format", default="json", choices=onectf.impl.output.output_formats, help="Format of the output file (default: %(default)s).")
@@ -1,7 +1,42 @@
+import bisect
 import re
 import sys
 
 
+class IntervalSet:
+    def __init__(self, string):
+        """
+        Set of integers given as comma separated values or ranges, e.g., '200-299,301'.
+        Ranges are sorted and merged once, then a lookup is a binary search.
+        """
+        intervals = []
+        for part in [part.strip() for part in string.split(',')]:
+            if part == 'all':
+                intervals.append((-sys.maxsize, sys.maxsize))
+            elif '-' in part:
+                start, end = part.split('-')
+                start, end = int(start), int(end)
+                if start > end:
+                    print(f'[ERROR] Invalid range ({start},{end})')
+                    sys.exit(2)
+                intervals.append((start, end))
+            else:
+                intervals.append((int(part), int(part)))
+
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, value):
+        i = bisect.bisect_right(self.starts, value) - 1
+        return i >= 0 and value <= self.ends[i]
+
+
 class FilteringHandler:
     def __init__(self, is_filter, status_codes, response_line_count, regex, response_size, response_word_count):
         self.isFilter = is_filter
@@ -18,10 +53,25 @@ class FilteringHandler:
         else:
             self.regex = None
 
-        self._allowed_code = self.expand(status_codes)
-        self._allowed_line_count = self.expand(response_line_count)
-        self._allowed_word_count = self.expand(response_word_count)
-        self._allowed_size = self.expand(response_size)
+        self._compile()
+
+    def _compile(self):
+        self._allowed_code = self.expand(self.status_code)
+        self._allowed_line_count = self.expand(self.line_count)
+        self._allowed_word_count = self.expand(self.word_count)
+        self._allowed_size = self.expand(self.size)
+
+    def extend(self, attribute, values):
+        """
+        Add values to a rule, e.g., extend('size', [0, 42]) on a filter is the same as '-fs 0,42'.
+        :param attribute: status_code, line_count, size or word_count
+        """
+        definition = ','.join(str(value) for value in values)
+        current_definition = getattr(self, attribute)
+        if current_definition is not None:
+            definition = current_definition + ',' + definition
+        setattr(self, attribute, definition)
+        self._compile()
 
     def _is_filter_valid_given_array(self, str_definition, current_value, array_definition):
         """
@@ -66,17 +116,67 @@ class FilteringHandler:
         return True
 
     def expand(self, string):
-        result = []
-        if string is not None:
-            parts = [part.strip() for part in string.split(',')]
-            for part in parts:
-                if '-' in part:
-                    start, end = part.split('-')
-                    start, end = int(start), int(end)
-                    if start > end:
-                        print(f'[ERROR] Invalid range ({start},{end})')
-                        sys.exit(2)
-                    result.extend(range(start, end + 1))
-                else:
-                    result.append(int(part))
-        return result
+        return IntervalSet(string) if string is not None else None
+
+
+class ResponsePredicate:
+    def __init__(self, matcher: FilteringHandler, response_filter: FilteringHandler):
+        """
+        The matcher and the filter fused into a single predicate.
+        The rules are evaluated from the cheapest to the most expensive one: the status code and the size
+        are known without reading the body, and the body rules are only evaluated when the first ones passed.
+        Each rule is (values, expected): matcher rules expect the value to be in 'values', filter rules don't.
+        """
+        self.status_rules = []
+        self.size_rules = []
+        self.line_rules = []
+        self.word_rules = []
+        self.regex_rules = []
+        for handler in [matcher, response_filter]:
+            expected = not handler.isFilter
+            for definition, values, rules in [(handler.status_code, handler._allowed_code, self.status_rules),
+                                              (handler.size, handler._allowed_size, self.size_rules),
+                                              (handler.line_count, handler._allowed_line_count, self.line_rules),
+                                              (handler.word_count, handler._allowed_word_count, self.word_rules),
+                                              (handler.regex, handler.regex, self.regex_rules)]:
+                if definition is not None:
+                    rules.append((values, expected))
+
+        # Whether the body must be parsed to evaluate the predicate
+        self.needs_body = bool(self.line_rules or self.word_rules or self.regex_rules)
+        # Rules learned by the auto-calibration, only applied to the status code they were learned from
+        self.calibration_rules = {}
+
+    def add_calibration_rule(self, status_code, metric, value):
+        """Reject the responses with this status code whose metric (size, hash, words or lines) is 'value'."""
+        self.calibration_rules[status_code] = (metric, value)
+
+    def is_valid_calibrated(self, status_code, metric):
+        """:param metric: function(name) returning a metric of the response, only called when a rule needs it"""
+        rule = self.calibration_rules.get(status_code)
+        return rule is None or metric(rule[0]) != rule[1]
+
+    def is_valid_head(self, status_code, response_size):
+        for values, expected in self.status_rules:
+            if (status_code in values) != expected:
+                return False
+        for values, expected in self.size_rules:
+            if (response_size in values) != expected:
+                return False
+        return True
+
+    def is_valid_body(self, line_count, content, word_count):
+        for values, expected in self.line_rules:
+            if (line_count in values) != expected:
+                return False
+        for values, expected in self.word_rules:
+            if (word_count in values) != expected:
+                return False
+        for regex, expected in self.regex_rules:
+            if (regex.search(content) is not None) != expected:
+                return False
+        return True
+
+    def is_valid(self, status_code, line_count, content, response_size, word_count):
+        return self.is_valid_head(status_code, response_size) and \
+            self.is_valid_body(line_count, content, word_count)
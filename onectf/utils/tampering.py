@@ -1,20 +1,53 @@
 import base64
+import functools
 import hashlib
+import re
 import sys
 import urllib.parse
 
 tamper_known_values = ['aliases', 'base64', 'data_base64', 'php_octal', 'space2tab', 'url']
 
+# Tamper operations only replacing substrings: consecutive ones are applied in a single pass
+replacements = {
+    'space2tab': {' ': '\u0009'},
+    'ifs': {' ': '${IFS}'},
+    'aliases': {
+        "<tab>": "\u0009",
+        "<q>": "\u0027",
+        "<m>": "-",
+        "<er>": "2>&1",
+        "<crlf>": "%0d%0a",
+        "<lf>": "%0a",
+    },
+}
+
+
+def compile_replacements(mapping):
+    """A function replacing every key of 'mapping' by its value, in a single pass over the word."""
+    if all(len(key) == 1 for key in mapping):
+        table = str.maketrans(mapping)
+        return lambda word: word.translate(table)
+    # the longest keys first, so that a key never hides a longer one
+    pattern = re.compile('|'.join(re.escape(key) for key in sorted(mapping, key=len, reverse=True)))
+    return lambda word: pattern.sub(lambda match: mapping[match.group(0)], word)
+
+
+replacement_functions = {operation: compile_replacements(mapping) for operation, mapping in replacements.items()}
+
 
 class TamperingHandler:
-    def __init__(self, tamper_list):
+    def __init__(self, tamper_list, cache_size=0):
+        """
+        The operations are compiled once into a single function. Consecutive replacements
+        (e.g., 'aliases,space2tab') are merged when the result is the same as applying them in order.
+        :param tamper_list: comma separated list of operations
+        :param cache_size: number of tampered words kept in a LRU cache (0 to disable)
+        """
         self.invoke = []
         self.__tamper_list = tamper_list
+        self.cache_size = cache_size
 
-        if tamper_list == "":
-            return
-
-        operations = tamper_list.split(',')
+        operations = tamper_list.split(',') if tamper_list != "" else []
 
         for operation in operations:
             _operation = "_" + operation
@@ -25,27 +58,75 @@ class TamperingHandler:
                 print(f"[ERROR] The tamper operation <{operation}> does not exist.")
                 sys.exit(2)
 
+        self._transform = self._compile(operations)
+        if cache_size > 0:
+            self._transform = functools.lru_cache(maxsize=cache_size)(self._transform)
+
+    def _compile(self, operations):
+        steps = []
+        mapping = None
+        for operation, method in zip(operations, self.invoke):
+            operation_mapping = replacements.get(operation)
+            if operation_mapping is not None and mapping is not None and \
+                    self._can_merge(mapping, operation_mapping):
+                mapping.update(operation_mapping)
+                continue
+            if mapping is not None:
+                steps.append(compile_replacements(mapping))
+            if operation_mapping is not None:
+                mapping = dict(operation_mapping)
+            else:
+                mapping = None
+                steps.append(method)
+        if mapping is not None:
+            steps.append(compile_replacements(mapping))
+
+        if len(steps) == 0:
+            return lambda word: word
+        if len(steps) == 1:
+            return steps[0]
+
+        def transform(word):
+            for step in steps:
+                word = step(word)
+            return word
+        return transform
+
+    @staticmethod
+    def _can_merge(mapping, next_mapping):
+        """
+        Applying both mappings at once is only the same as applying them in order if no key of
+        the next mapping may be found in (or around) a value of the first mapping, and if no key
+        of the first mapping may hide a key of the next one.
+        """
+        for key in next_mapping:
+            for value in mapping.values():
+                if any(c in value for c in key):
+                    return False
+            for previous_key in mapping:
+                if any(c in previous_key for c in key):
+                    return False
+        return True
+
     def apply(self, word):
-        for method in self.invoke:
-            word = method(word)
-        return word
+        return self._transform(word)
+
+    def apply_batch(self, words):
+        """Tamper a list of words."""
+        transform = self._transform
+        return [transform(word) for word in words]
 
     def _space2tab(self, word):
-        return word.replace(' ', '\u0009')
+        return replacement_functions['space2tab'](word)
 
     def _ifs(self, word):
-        return word.replace(' ', '${IFS}')
+        return replacement_functions['ifs'](word)
 
     def _url(self, word):
         return urllib.parse.quote(word)
 
     def _aliases(self, word):
-        return word.replace("<tab>", "\u0009") \
-                     .replace("<q>", "\u0027") \
-                     .replace("<m>", "-") \
-                     .replace("<er>", "2>&1") \
-                     .replace("<crlf>", "%0d%0a") \
-                     .replace("<lf>", "%0a")
+        return replacement_functions['aliases'](word)
 
     def _data_base64(self, word):
         return f'data://text/plain;base64,{self._base64(word)}'
@@ -63,28 +144,28 @@ class TamperingHandler:
         Dummy function.
         Encode each word using octal and quote it.
         """
-        encoded = ''
+        encoded = []
         first_letter = True
         had_letter = False
         for letter in word:
             if letter.isalpha():
                 if first_letter:
-                    encoded += '"'
+                    encoded.append('"')
                     first_letter = False
                     had_letter = True
-                encoded += "\\" + oct(ord(letter))
+                encoded.append("\\" + format(ord(letter), 'o'))
             else:
                 if had_letter:
-                    encoded += '"'
+                    encoded.append('"')
                     had_letter = False
-                encoded += letter
+                encoded.append(letter)
         if had_letter:
-            encoded += '"'
-        return encoded.replace("\\0o", "\\")
+            encoded.append('"')
+        return ''.join(encoded)
 
     def _php_base_convert(self, word):
         """Experimental, require testing"""
-        encoded, tmp = '', ''
+        encoded, tmp = [], []
         last_was_alpha = False
 
         for letter in word:
@@ -92,24 +173,23 @@ class TamperingHandler:
                 continue
 
             if letter.isalpha():
-                tmp += letter
+                tmp.append(letter)
             else:
                 if tmp:
-                    tmp = ("." if last_was_alpha else "") + "base_convert(" + str(int(tmp, 36)) + ",10,36)"
-                    encoded += tmp
-                    tmp = ""
+                    encoded.append(("." if last_was_alpha else "") + "base_convert(" + str(int(''.join(tmp), 36)) + ",10,36)")
+                    tmp = []
                     last_was_alpha = True
 
                 if letter == '.':
-                    encoded += ("." if last_was_alpha else "") + 'phpversion()[1]'
+                    encoded.append(("." if last_was_alpha else "") + 'phpversion()[1]')
                     last_was_alpha = True
                 elif letter == ' ':
-                    encoded += ("." if last_was_alpha else "") + 'microtime()[10]'
+                    encoded.append(("." if last_was_alpha else "") + 'microtime()[10]')
                     last_was_alpha = True
                 else:
-                    encoded += letter
+                    encoded.append(letter)
                     last_was_alpha = False
-        return encoded
+        return ''.join(encoded)
 
     def __str__(self):
         return self.__tamper_list
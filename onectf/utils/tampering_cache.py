@@ -0,0 +1,97 @@
+import array
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+
+import onectf.utils.tampering
+
+
+class TamperCache:
+    def __init__(self, directory, wordlist, tamper: onectf.utils.tampering.TamperingHandler):
+        """
+        Tampered wordlists saved on disk, keyed by the hash of the wordlist and the tamper operations.
+        A cached wordlist is made of two files:
+        * '<key>.data': the tampered words (UTF-8) one after the other, without separator
+        * '<key>.index': the offset of the end of each word in the data file (native unsigned 64-bit integers)
+        Both files are memory-mapped when reading, so the words are streamed without tampering them again.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.wordlist = wordlist
+        self.tamper = tamper
+
+        digest = hashlib.sha256()
+        with open(self.wordlist, 'rb') as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        digest.update(str(self.tamper).encode())
+        self.key = digest.hexdigest()
+        self.data_path = os.path.join(self.directory, self.key + '.data')
+        self.index_path = os.path.join(self.directory, self.key + '.index')
+
+    def exists(self):
+        return os.path.exists(self.index_path) and os.path.exists(self.data_path)
+
+    def words(self, words):
+        """
+        The tampered words. They are read from the cache when it exists,
+        otherwise 'words' are tampered and saved into the cache while they are consumed.
+        """
+        if self.exists():
+            logging.info(f'[*] Using the tampered wordlist {self.data_path}')
+            return self._read()
+        return self._build(words)
+
+    def _read(self):
+        with open(self.index_path, 'rb') as index_file, open(self.data_path, 'rb') as data_file:
+            if os.fstat(index_file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as index_map:
+                # the data file is empty when all the words are empty
+                data_map = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) \
+                    if os.fstat(data_file.fileno()).st_size > 0 else b''
+                index = memoryview(index_map).cast('Q')
+                try:
+                    start = 0
+                    for end in index:
+                        yield data_map[start:end].decode('utf-8', 'surrogatepass')
+                        start = end
+                finally:
+                    # the map cannot be closed while it is exported, e.g., when the words are not all consumed
+                    index.release()
+                    if data_map:
+                        data_map.close()
+
+    def _build(self, words):
+        os.makedirs(self.directory, exist_ok=True)
+        # Each build has its own files: the same wordlist may be built twice at the same time
+        # (e.g., -w words.txt:USER -w words.txt:PASS). The builds are identical, so the last one renamed wins.
+        data_fd, data_path = tempfile.mkstemp(prefix=self.key, suffix='.data.tmp', dir=self.directory)
+        index_fd, index_path = tempfile.mkstemp(prefix=self.key, suffix='.index.tmp', dir=self.directory)
+        completed = False
+        try:
+            with open(data_fd, 'wb') as data_file, open(index_fd, 'wb') as index_file:
+                offset = 0
+                index = array.array('Q')
+                for word in words:
+                    tampered = self.tamper.apply(word)
+                    encoded = tampered.encode('utf-8', 'surrogatepass')
+                    data_file.write(encoded)
+                    offset += len(encoded)
+                    index.append(offset)
+                    if len(index) >= 4096:
+                        index.tofile(index_file)
+                        index = array.array('Q')
+                    yield tampered
+                index.tofile(index_file)
+            # The cache is only created once the whole wordlist was tampered
+            os.replace(data_path, self.data_path)
+            os.replace(index_path, self.index_path)
+            completed = True
+            logging.info(f'[*] Saved the tampered wordlist {self.data_path}')
+        finally:
+            if not completed:
+                for path in [data_path, index_path]:
+                    if os.path.exists(path):
+                        os.remove(path)
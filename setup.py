@@ -6,6 +6,9 @@ setuptools.setup(
     version=onectf.impl.constants.version,
     packages=setuptools.find_packages(),
     install_requires=[x.strip() for x in open("requirements.txt").readlines()],
+    extras_require={
+        'async': ['aiohttp==3.14.5'],
+    },
     entry_points={
         'console_scripts': [
             'onectf = onectf.main:main',
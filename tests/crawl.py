@@ -1,4 +1,9 @@
 import copy
+import json
+import os
+import tempfile
+import contextlib
+import io
 import scrapy.http
 import unittest.mock
 import onectf.jobs.crawl
@@ -14,6 +19,7 @@ class TestHosts(unittest.TestCase):
     def test_dummy(self):
         crawl_data = copy.deepcopy(base_crawl_data)
         spider = onectf.jobs.crawl.CustomCrawler(crawl_data)
+        self.addCleanup(spider.findings.close)
         response = scrapy.http.HtmlResponse(
             url=crawl_data.url,
             body='<html><body>'
@@ -73,3 +79,156 @@ class TestHosts(unittest.TestCase):
             '<!-- \nSecret API KEY: 1337        \n-->'
         })
 
+    def test_frontier(self):
+        crawl_data = copy.deepcopy(base_crawl_data)
+        spider = onectf.jobs.crawl.CustomCrawler(crawl_data)
+        self.addCleanup(spider.findings.close)
+        self.assertEqual(1, len(list(spider.start_requests())))
+        response = scrapy.http.HtmlResponse(
+            url=crawl_data.url,
+            body='<html><body>'
+                 '<a href="/folder/a.php?y=1&x=2">test</a>'
+                 '<a href="/folder/a.php?x=2&y=1#anchor">same page</a>'
+                 '<a href="/folder/b.php">test</a>'
+                 '<a href="/">same page</a>'
+                 '<img src="/folder/./image.png">'
+                 '</html>',
+            headers={
+                'Content-Type': 'text/html'
+            },
+            encoding='utf-8'
+        )
+        urls = [request.url for request in spider.parse(response)]
+        self.assertEqual(msg="Requests", first=sorted(urls), second=[
+            'https://example.com/folder/',
+            'https://example.com/folder/a.php?y=1&x=2',
+            'https://example.com/folder/b.php',
+            'https://example.com/folder/image.png',
+        ])
+        # Each page is only queued once
+        self.assertEqual([], list(spider.parse(response)))
+
+    def test_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for output_format in ['json', 'jsonl']:
+                crawl_data = copy.deepcopy(base_crawl_data)
+                crawl_data.output_file = os.path.join(directory, 'output.' + output_format)
+                crawl_data.output_format = output_format
+                spider = onectf.jobs.crawl.CustomCrawler(crawl_data)
+                response = scrapy.http.HtmlResponse(
+                    url=crawl_data.url + '/index.php',
+                    body='<html><body><a href="/a.php">test</a><!--comment--></html>',
+                    headers={
+                        'Content-Type': 'text/html'
+                    },
+                    encoding='utf-8'
+                )
+                _ = list(spider.parse(response))
+                if output_format == 'jsonl':
+                    # The findings are written while they are found
+                    spider.findings.stream.flush()
+                    with open(crawl_data.output_file) as f:
+                        findings = [json.loads(line) for line in f]
+                    self.assertIn({'type': 'link', 'value': 'https://example.com/a.php',
+                                   'source': 'https://example.com/index.php'}, findings)
+                    self.assertIn({'type': 'comment', 'value': '<!--comment-->',
+                                   'source': 'https://example.com/index.php'}, findings)
+                results = spider.findings.close()
+                self.assertEqual({'https://example.com/', 'https://example.com/a.php'}, results['links'])
+                if output_format == 'json':
+                    with open(crawl_data.output_file) as f:
+                        self.assertEqual(['https://example.com/', 'https://example.com/a.php'], json.load(f)['links'])
+
+    def test_state_dir(self):
+        def new_spider():
+            crawl_data = copy.deepcopy(base_crawl_data)
+            crawl_data.state_dir = directory
+            return onectf.jobs.crawl.CustomCrawler(crawl_data)
+
+        response = scrapy.http.HtmlResponse(
+            url='https://example.com',
+            body='<html><body><a href="/a.php">test</a></html>',
+            headers={
+                'Content-Type': 'text/html'
+            },
+            encoding='utf-8'
+        )
+        with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            # The crawl is interrupted
+            spider = new_spider()
+            self.assertFalse(spider.crawl_state.resumed)
+            self.assertEqual(1, len(list(spider.start_requests())))
+            self.assertEqual(1, len(list(spider.parse(response))))
+            spider.closed('shutdown')
+
+            # The crawl is resumed: the URLs already seen are not requested again
+            spider = new_spider()
+            self.assertTrue(spider.crawl_state.resumed)
+            self.assertEqual([], list(spider.start_requests()))
+            self.assertEqual([], list(spider.parse(response)))
+            self.assertEqual({'https://example.com/', 'https://example.com/a.php'}, spider.results['links'])
+            spider.closed('finished')
+
+            # The crawl is done again (the HTTP cache only downloads the pages that changed)
+            spider = new_spider()
+            self.assertFalse(spider.crawl_state.resumed)
+            self.assertEqual(1, len(list(spider.start_requests())))
+            self.assertEqual(set(), spider.results['links'])
+            spider.findings.close()
+            self.assertEqual('scrapy.extensions.httpcache.RFC2616Policy', spider.crawl_state.settings()['HTTPCACHE_POLICY'])
+
+    def test_extract_links(self):
+        response = scrapy.http.HtmlResponse(
+            url='https://example.com',
+            body='<html><head><link href="a.css"><script src="a.js"></script></head><body>'
+                 '<!--first--><a href="/a.php" onclick="location.href=\'/b.php\'">a</a><a>no href</a>'
+                 '<iframe src="ignored.html"></iframe><img src="a.png"><!--second--></body></html>',
+            headers={
+                'Content-Type': 'text/html'
+            },
+            encoding='utf-8'
+        )
+        self.assertEqual([
+            ('resource', 'a.css'), ('resource', 'a.js'), ('comment', '<!--first-->'), ('a', '/a.php'),
+            ('onclick', "location.href='/b.php'"), ('resource', 'a.png'), ('comment', '<!--second-->')
+        ], onectf.jobs.crawl.extract_links(response.selector.root, with_comments=True))
+        self.assertEqual(('https://example.com/a/b.php', 'example.com', 'https://example.com/a/'),
+                         onectf.jobs.crawl.join_url('https://example.com/a/', 'b.php#anchor'))
+
+    def test_join_url_cache(self):
+        onectf.jobs.crawl.join_link.cache_clear()
+        links = [f'page{i}.php' for i in range(10)] + [f'/nav/{i}' for i in range(10)]
+        for page in ['https://example.com/a/index.php', 'https://example.com/a/b.php?id=1', 'https://example.com/a/c.php']:
+            for link in links:
+                onectf.jobs.crawl.join_url(page, link)
+        # the pages of the same folder share the relative and absolute links
+        info = onectf.jobs.crawl.join_link.cache_info()
+        self.assertEqual((40, 20), (info.hits, info.misses))
+        # a query or a fragment depends on the page
+        self.assertEqual('https://example.com/a/b.php?x', onectf.jobs.crawl.join_url('https://example.com/a/b.php?id=1', '?x')[0])
+        self.assertEqual('https://example.com/a/c.php?x', onectf.jobs.crawl.join_url('https://example.com/a/c.php', '?x')[0])
+
+    def test_script(self):
+        crawl_data = copy.deepcopy(base_crawl_data)
+        spider = onectf.jobs.crawl.CustomCrawler(crawl_data)
+        self.addCleanup(spider.findings.close)
+        script = b'fetch("/api/users");axios.post(`api/login`);var cdn="https://not.example.com/lib.js";'
+        for url in ['https://example.com/static/app.js', 'https://example.com/static/vendor.js']:
+            response = scrapy.http.Response(url=url, body=script, headers={'Content-Type': 'application/javascript'})
+            _ = list(spider.parse(response))
+        # The same script is only scanned once
+        self.assertEqual((1, 1), (spider.miner.scanned, spider.miner.cached))
+        self.assertEqual({'https://example.com/api/users', 'https://example.com/api/login'}, spider.results['endpoints'])
+        self.assertIn('https://not.example.com/lib.js', spider.results['external'])
+
+        # The inline scripts of a page
+        response = scrapy.http.HtmlResponse(
+            url=crawl_data.url,
+            body='<html><body><script>fetch("/api/items")</script></html>',
+            headers={
+                'Content-Type': 'text/html'
+            },
+            encoding='utf-8'
+        )
+        urls = [request.url for request in spider.parse(response)]
+        self.assertIn('https://example.com/api/items', urls)
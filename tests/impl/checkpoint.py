@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+import onectf.impl.checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            checkpoint = onectf.impl.checkpoint.Checkpoint(path, 'words.txt')
+            for index, word in checkpoint.skip(['a', 'b', 'c', 'd', 'e']):
+                if word in ['a', 'b', 'd']:
+                    checkpoint.complete(index)
+                    checkpoint.results.append(word)
+            checkpoint.save()
+            self.assertEqual(2, checkpoint.offset)
+
+            checkpoint = onectf.impl.checkpoint.Checkpoint(path, 'words.txt')
+            self.assertEqual(['a', 'b', 'd'], checkpoint.results)
+            self.assertEqual([(2, 'c'), (4, 'e')], list(checkpoint.skip(['a', 'b', 'c', 'd', 'e'])))
+
+    def test_disabled(self):
+        checkpoint = onectf.impl.checkpoint.Checkpoint(None, 'words.txt')
+        checkpoint.complete(0)
+        checkpoint.save()
+        self.assertEqual([(0, 'a'), (1, 'b')], list(checkpoint.skip(['a', 'b'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+import onectf.impl.clustering
+
+
+class TestClustering(unittest.TestCase):
+    def test_fingerprint(self):
+        fingerprint = onectf.impl.clustering.fingerprint
+        self.assertEqual(fingerprint('a b', 200, 'Hello a b'), fingerprint('<c>', 200, 'Hello &lt;c&gt;'))
+        self.assertEqual(fingerprint('x y', 200, 'Hello x%20y'), fingerprint('z', 200, 'Hello z'))
+        self.assertNotEqual(fingerprint('d', 200, 'found'), fingerprint('e', 200, 'found'.replace('d', '')))
+        self.assertNotEqual(fingerprint('a', 200, 'Hello'), fingerprint('a', 404, 'Hello'))
+
+    def test_bounded_clusters(self):
+        response = type('response', (), {'headers': {}})
+        clusters = onectf.impl.clustering.ResponseClusters([], max_clusters=2, max_samples=2)
+        for word in ['a', 'b', 'c', 'd']:
+            clusters.add(word, response, {'status': 200, 'size': 1, 'words': 1, 'lines': 1, 'content': 'page ' + word * 2})
+        self.assertFalse(clusters.add('e', response, {'status': 200, 'size': 1, 'words': 1, 'lines': 1, 'content': 'page aa'}))
+        self.assertEqual(2, len(clusters))
+        self.assertEqual(2, clusters.unclustered)
+        self.assertEqual(['a', 'e'], clusters.results[0]['samples'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import threading
+import unittest
+
+import onectf.impl.console
+
+result = {'status': 200, 'size': 1, 'words': 1, 'lines': 1, 'content': 'a'}
+
+
+class TestConsole(unittest.TestCase):
+    def test_hits(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            console = onectf.impl.console.Console()
+            console.hit('admin', result, {})
+            console.error('[ERROR] timeout')
+            console.print('[*] Found URL https://example.com/')
+            console.close()
+        self.assertIn('admin', output.getvalue())
+        self.assertIn('[*] Found URL https://example.com/\n', output.getvalue())
+        self.assertIn('[ERROR] timeout', output.getvalue())
+
+    def test_quiet(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            console = onectf.impl.console.Console(quiet=True)
+            for word in ['a', 'b']:
+                console.hit(word, result, {})
+                console.word_done()
+            console.error('[ERROR] timeout')
+            console.print('[*] Found URL https://example.com/')
+            console.word_done()
+            console.close()
+        self.assertEqual('[*] Progress: 3 words, 2 hits, 1 errors\n', output.getvalue())
+
+    def test_concurrent_hits(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            console = onectf.impl.console.Console(quiet=True)
+            barrier = threading.Barrier(8)
+
+            def hit(word):
+                barrier.wait()
+                console.hit(word, result, {})
+                console.word_done()
+
+            threads = [threading.Thread(target=hit, args=(str(index),)) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            close = threading.Thread(target=console.close, daemon=True)
+            close.start()
+            close.join(timeout=5)
+        self.assertFalse(close.is_alive())
+        self.assertEqual('[*] Progress: 8 words, 8 hits, 0 errors\n', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+import onectf.impl.endpoints
+
+script = b'''fetch("/api/users?id=" + id); axios.post('login', data); xhr.open("GET", `/api/items/${id}/edit`);
+var url = "https://example.com/v2/x"; var route = 'api/v1/status'; var type = "text/html"; var cdn = "//cdn.example.com/a.js";
+var root = "/"; $.getJSON("data.json"); var css = "/static/app.css"; var orders = "../v1/orders";'''
+
+
+class TestEndpoints(unittest.TestCase):
+    def test_find_endpoints(self):
+        expected = ['/api/users?id=', 'login', '/api/items/', 'https://example.com/v2/x', 'api/v1/status',
+                    'data.json', '/static/app.css', '../v1/orders']
+        self.assertEqual(expected, onectf.impl.endpoints.find_endpoints(script))
+        # The endpoints across two chunks are found
+        self.assertEqual(expected, onectf.impl.endpoints.find_endpoints(script, chunk_size=7))
+
+    def test_cache(self):
+        miner = onectf.impl.endpoints.EndpointMiner(cache_size=1)
+        miner.mine(script)
+        miner.mine(script)
+        miner.mine(b'fetch("/a")')
+        self.assertEqual(['/a'], miner.mine(b'fetch("/a")'))
+        miner.mine(script)
+        self.assertEqual((3, 2), (miner.scanned, miner.cached))
+
+
+if __name__ == '__main__':
+    unittest.main()
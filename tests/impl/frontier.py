@@ -0,0 +1,38 @@
+import unittest
+
+import onectf.impl.frontier
+
+
+class TestFrontier(unittest.TestCase):
+    def test_canonical_url(self):
+        canonical_url = onectf.impl.frontier.canonical_url
+        self.assertEqual('http://example.com/', canonical_url('HTTP://Example.COM:80'))
+        self.assertEqual('https://example.com:8443/a/c/', canonical_url('https://example.com:8443/a/./b/../c/#top'))
+        self.assertEqual('https://example.com/a/', canonical_url('https://example.com/a/b/..'))
+        self.assertEqual('https://example.com/?a=2&b=1&b=3', canonical_url('https://example.com/?b=1&a=2&b=3'))
+        self.assertEqual('https://user@[::1]/', canonical_url('https://user@[::1]:443/'))
+        # the case of the path is kept
+        self.assertNotEqual(canonical_url('https://example.com/A'), canonical_url('https://example.com/a'))
+
+    def test_frontier(self):
+        frontier = onectf.impl.frontier.UrlFrontier()
+        self.assertTrue(frontier.add('https://example.com/?b=1&a=2'))
+        self.assertFalse(frontier.add('https://EXAMPLE.com:443/?a=2&b=1#anchor'))
+        self.assertIn('https://example.com/?a=2&b=1', frontier)
+        self.assertNotIn('https://example.com/', frontier)
+        self.assertEqual(1, len(frontier))
+
+    def test_bloom_filter(self):
+        frontier = onectf.impl.frontier.UrlFrontier(max_set_size=10, bloom_capacity=1000, error_rate=0.001)
+        urls = [f'https://example.com/{i}' for i in range(100)]
+        for url in urls:
+            self.assertTrue(frontier.add(url))
+        self.assertIsNotNone(frontier.bloom)
+        self.assertEqual(set(), frontier.hashes)
+        for url in urls:
+            self.assertFalse(frontier.add(url))
+        self.assertEqual(100, len(frontier))
+
+
+if __name__ == '__main__':
+    unittest.main()
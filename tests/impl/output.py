@@ -0,0 +1,69 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import onectf.impl.output
+
+
+class TestOutput(unittest.TestCase):
+    def test_json_append(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            writer = onectf.impl.output.ResultWriter(path, 'json')
+            writer.write({'word': 'a'})
+            writer.flush()
+            with open(path, 'r') as f:
+                self.assertIn('"a"', f.read())
+            writer.close()
+
+            writer = onectf.impl.output.ResultWriter(path, 'json', append=True)
+            writer.write({'word': 'b'})
+            writer.close()
+            with open(path, 'r') as f:
+                self.assertEqual([{'word': 'a'}, {'word': 'b'}], json.load(f))
+
+            writer = onectf.impl.output.ResultWriter(path, 'json')
+            writer.close()
+            with open(path, 'r') as f:
+                self.assertEqual([], json.load(f))
+
+    def test_csv_append(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            for word in ['a', 'b']:
+                writer = onectf.impl.output.ResultWriter(path, 'csv', append=True)
+                writer.write({'word': word, 'headers': {'X': '1'}})
+                writer.close()
+            with open(path, 'r', newline='') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(['a', 'b'], [row['word'] for row in rows])
+            self.assertEqual({'X': '1'}, json.loads(rows[1]['headers']))
+
+    def test_concurrent_writes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.jsonl')
+            writer = onectf.impl.output.ResultWriter(path, 'jsonl')
+            barrier = threading.Barrier(8)
+
+            def write(index):
+                barrier.wait()
+                writer.write({'word': index})
+
+            threads = [threading.Thread(target=write, args=(index,)) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            close = threading.Thread(target=writer.close, daemon=True)
+            close.start()
+            close.join(timeout=5)
+            self.assertFalse(close.is_alive())
+            with open(path, 'r') as f:
+                self.assertEqual(set(range(8)), {json.loads(line)['word'] for line in f})
+
+
+if __name__ == '__main__':
+    unittest.main()
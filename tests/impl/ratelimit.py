@@ -0,0 +1,40 @@
+import unittest
+
+import onectf.impl.ratelimit
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_parse_rate(self):
+        self.assertEqual(None, onectf.impl.ratelimit.parse_rate(None))
+        self.assertEqual(50, onectf.impl.ratelimit.parse_rate('50'))
+        self.assertEqual(50, onectf.impl.ratelimit.parse_rate('50/s'))
+        self.assertEqual(10, onectf.impl.ratelimit.parse_rate('600/m'))
+        with self.assertRaises(SystemExit):
+            onectf.impl.ratelimit.parse_rate('fast')
+
+    def test_token_bucket(self):
+        limiter = onectf.impl.ratelimit.RateLimiter(10, 2, False, 4)
+        self.assertEqual(0, limiter.reserve('a'))
+        self.assertAlmostEqual(0.1, limiter.reserve('b'), delta=0.01)
+        self.assertAlmostEqual(0.5, limiter.reserve('a'), delta=0.01)
+
+    def test_adaptive_concurrency(self):
+        limiter = onectf.impl.ratelimit.RateLimiter(None, None, True, 8)
+        self.assertEqual(4, limiter.limit)
+        for _ in range(4):
+            limiter.acquire('a')
+            limiter.release(0.1, 200)
+        self.assertEqual(5, limiter.limit)
+        for _ in range(5):
+            limiter.acquire('a')
+            limiter.release(0.1, 429)
+        self.assertEqual(3, limiter.limit)
+        for _ in range(3):
+            limiter.acquire('a')
+            limiter.release(0.5, 200)
+        self.assertEqual(2, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
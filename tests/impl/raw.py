@@ -0,0 +1,106 @@
+import http.server
+import os
+import tempfile
+import threading
+import unittest
+
+import onectf.impl.raw
+
+
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """A body of 100000 bytes, chunked for '/chunked', and a chunked body that never ends for '/stream'."""
+        body = b'x' * 100000
+        self.send_response(200)
+        if self.path == '/stream':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                while True:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (7000, body[:7000]))
+            except OSError:
+                pass
+        elif self.path == '/chunked':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(body), 7000):
+                chunk = body[start:start + 7000]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRaw(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write_request(self, data):
+        path = os.path.join(self.directory, 'request.txt')
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def test_render(self):
+        path = self.write_request(b'POST /upload?id=FUZZ HTTP/1.1\nHost: example.com\nContent-Length: 3\n'
+                             b'Accept-Encoding: gzip\n\nname=FUZZ')
+        request = onectf.impl.raw.RawRequest(path)
+        self.assertEqual('POST', request.method)
+        self.assertEqual('http://example.com/upload?id=FUZZ', request.url)
+
+        template = request.compile(['FUZZ'])
+        url, method, data = template.render(['é'])
+        self.assertEqual('http://example.com/upload?id=é', url)
+        self.assertEqual('POST', method)
+        # the length is computed from the bytes of the word
+        self.assertEqual(b'POST /upload?id=\xc3\xa9 HTTP/1.1\r\nHost: example.com\r\nContent-Length: 7\r\n\r\nname=\xc3\xa9', data)
+
+    def test_target_url(self):
+        path = self.write_request(b'GET http://proxy.example.com/a HTTP/1.1\r\nHost: example.com\r\n\r\n')
+        self.assertEqual('http://proxy.example.com/a', onectf.impl.raw.RawRequest(path).url)
+        self.assertEqual('https://127.0.0.1:8443/a', onectf.impl.raw.RawRequest(path, 'https://127.0.0.1:8443').url)
+
+    def test_http2(self):
+        path = self.write_request(b'GET /FUZZ HTTP/2\r\nHost: example.com\r\n\r\n')
+        _, _, data = onectf.impl.raw.RawRequest(path).compile(['FUZZ']).render(['a'])
+        self.assertEqual(b'GET /a HTTP/1.1\r\nHost: example.com\r\n\r\n', data)
+
+    def test_chunked(self):
+        path = self.write_request(b'POST /upload HTTP/1.1\r\nHost: example.com\r\nTransfer-Encoding: chunked\r\n\r\n'
+                                  b'5\r\nname=\r\n4;ext=1\r\nFUZZ\r\n0\r\n\r\n')
+        request = onectf.impl.raw.RawRequest(path)
+        self.assertEqual('name=FUZZ', request.body)
+
+        _, _, data = request.compile(['FUZZ']).render(['admin'])
+        # the body is sent with its length, not with the chunks
+        self.assertEqual(b'POST /upload HTTP/1.1\r\nHost: example.com\r\nContent-Length: 10\r\n\r\nname=admin', data)
+
+    def test_truncated_size(self):
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}'
+            client = onectf.impl.raw.RawClient(url, True, True)
+            # the size is the Content-Length, otherwise the number of bytes kept (the rest is never read)
+            for path, size in [('/', 100000), ('/chunked', 45000), ('/stream', 45000), ('/', 100000)]:
+                data = f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n'.encode()
+                response = client.send(url + path, 'GET', data, 45000)
+                self.assertTrue(response.truncated)
+                self.assertEqual(45000, len(response.content))
+                self.assertEqual(size, response.size)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import gzip
+import io
+import unittest
+
+import requests
+import urllib3
+
+import onectf.impl.response
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self._text = text
+        self.reads = 0
+
+    @property
+    def text(self):
+        self.reads += 1
+        return self._text
+
+
+class TestResponse(unittest.TestCase):
+    def test_lazy_content(self):
+        response = FakeResponse('<p>Hello</p>\n\n<p>World !</p>')
+        body = onectf.impl.response.ResponseContent(response, 'raw')
+        self.assertEqual(0, response.reads)
+        self.assertEqual(3, body.lines)
+        self.assertEqual(3, body.words)
+        self.assertEqual('<p>Hello</p>\n<p>World !</p>', body.content)
+        self.assertEqual(1, response.reads)
+
+    def test_html_content(self):
+        body = onectf.impl.response.ResponseContent(FakeResponse('<p>Hello</p><p>World</p>'), 'html')
+        self.assertEqual('Hello\nWorld\n', body.content)
+        self.assertEqual(2, body.words)
+
+    def test_read_response(self):
+        for max_body, content, truncated in [(None, b'x' * 100000, False), (100001, b'x' * 100000, False),
+                                             (70000, b'x' * 70000, True), (10, b'x' * 10, True)]:
+            response = requests.Response()
+            response.status_code = 200
+            response.headers['Content-Type'] = 'text/plain; charset=utf-8'
+            response.raw = io.BytesIO(b'x' * 100000)
+            response = onectf.impl.response.read_response(response, max_body)
+            self.assertEqual(content, response.content)
+            self.assertEqual(truncated, response.truncated)
+            self.assertEqual(content.decode(), response.text)
+            # without a Content-Length, the size of a truncated body is the number of bytes kept
+            self.assertEqual(len(content), response.size)
+
+    def test_truncated_size(self):
+        body = b'x' * 100000
+        headers = {'Content-Length': str(len(body))}
+        for chunk_size in [1000, 30000]:
+            response = requests.Response()
+            response.status_code = 200
+            response.headers.update(headers)
+            response.raw = urllib3.HTTPResponse(body=io.BytesIO(body), headers=headers, preload_content=False)
+            response.iter_content = lambda size, iter_content=response.iter_content: iter_content(chunk_size)
+            response = onectf.impl.response.read_response(response, 45000)
+            self.assertEqual(b'x' * 45000, response.content)
+            self.assertTrue(response.truncated)
+            # the size is the Content-Length, whatever the chunks
+            self.assertEqual(len(body), response.size)
+
+    def test_response_size(self):
+        body = b'<p>' + b'x' * 10000 + b'</p>'
+        compressed = gzip.compress(body)
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(compressed), headers={'Content-Encoding': 'gzip'},
+                                            preload_content=False)
+        response = onectf.impl.response.read_response(response, None)
+        self.assertEqual(body, response.content)
+        self.assertEqual(len(body), response.size)
+        self.assertEqual(len(compressed), response.wire_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import unittest
+
+import onectf.impl.ratelimit
+import onectf.impl.stats
+
+
+class TestStats(unittest.TestCase):
+    def test_snapshot(self):
+        stats = onectf.impl.stats.Stats()
+        limiter = onectf.impl.ratelimit.RateLimiter(None, None, False, 2, stats)
+        # e.g., the calibration requests, sent before the run
+        with limiter.slot('example.com') as slot:
+            slot.status_code = 500
+        stats.start(total=4)
+        with limiter.slot('example.com') as slot:
+            slot.status_code = 200
+            self.assertEqual(1, stats.snapshot()['in_flight'])
+        with self.assertRaises(ConnectionError):
+            with limiter.slot('example.com'):
+                raise ConnectionError()
+        stats.record(0.5, 404, started=False)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(3, snapshot['completed'])
+        self.assertEqual(0, snapshot['in_flight'])
+        self.assertEqual({'2xx': 1, '4xx': 1}, snapshot['statuses'])
+        self.assertEqual({'ConnectionError': 1}, snapshot['errors'])
+        self.assertEqual(0.5, snapshot['latency']['p99'])
+        self.assertIn('3/4 (75.0%) requests', stats.line())
+
+    def test_stats_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.json')
+            stats = onectf.impl.stats.Stats(path=path, interval=60)
+            stats.start()
+            stats.record(0.1, 200, started=False)
+            stats.close()
+            with open(path, 'r') as f:
+                self.assertEqual(1, json.load(f)['completed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
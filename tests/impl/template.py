@@ -0,0 +1,29 @@
+import unittest
+
+import onectf.impl.template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_string_template(self):
+        template = onectf.impl.template.StringTemplate('/FUZZ2/FUZZ?q=FUZZ', ['FUZZ', 'FUZZ2'])
+        self.assertEqual((1, 0, 0), template.slots)
+        # a word containing a keyword is not replaced again
+        self.assertEqual('/a/FUZZ2?q=FUZZ2', template.render(['FUZZ2', 'a']))
+        self.assertEqual('static', onectf.impl.template.StringTemplate('static', ['FUZZ']).render(['a']))
+
+    def test_query_parameter(self):
+        template = onectf.impl.template.StringTemplate.for_query_parameter('https://example.com/?a=1&a=2&x=0#f', 'x')
+        self.assertEqual('https://example.com/?a=1&a=2&x=%2F+%3F#f', template.render(['/ ?']))
+
+    def test_request_template(self):
+        headers = {'Accept': '*/*'}
+        template = onectf.impl.template.RequestTemplate('https://example.com/', headers, {'id': 'FUZZ'}, {}, ['FUZZ'])
+        url, rendered_headers, cookies, body = template.render(['1'])
+        self.assertEqual('https://example.com/', url)
+        self.assertIs(headers, rendered_headers)
+        self.assertEqual({'id': '1'}, cookies)
+        self.assertEqual({0}, template.slots)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import threading
+import unittest
+
+import onectf.impl.worker
+
+
+class TestWorker(unittest.TestCase):
+    def test_read_wordlist(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as f:
+            f.write('a\n b \nc')
+            f.flush()
+            words = onectf.impl.worker.read_wordlist(f.name)
+            self.assertEqual(['a', 'b', 'c'], list(words))
+
+    def test_read_missing_wordlist(self):
+        with self.assertRaises(FileNotFoundError):
+            onectf.impl.worker.read_wordlist('data/missing.txt')
+
+    def test_combine_wordlists(self):
+        reads = []
+
+        def source(words):
+            def read():
+                reads.append(words)
+                return iter(words)
+            return read
+
+        sources = [source(['a', 'b']), source(['1', '2', '3'])]
+        self.assertEqual([('a', '1'), ('b', '2')], list(onectf.impl.worker.combine_wordlists(sources, 'pitchfork')))
+        reads.clear()
+        combinations = onectf.impl.worker.combine_wordlists(sources, 'clusterbomb')
+        self.assertEqual(('a', '1'), next(combinations))
+        self.assertEqual([('a', '2'), ('a', '3'), ('b', '1'), ('b', '2'), ('b', '3')], list(combinations))
+        # the inner wordlist is read again for each outer word
+        self.assertEqual([['a', 'b'], ['1', '2', '3'], ['1', '2', '3']], reads)
+
+    def test_bounded_queue(self):
+        args = type('args', (), {'threads': 2})
+        args.words = onectf.impl.worker.new_queue(args)
+        args.seen = []
+        lock = threading.Lock()
+
+        def execute_worker_task(args):
+            while True:
+                word = args.words.get()
+                if word is None:
+                    break
+                with lock:
+                    args.seen.append(word)
+                args.words.task_done()
+
+        onectf.impl.worker.start_threads(execute_worker_task, args, args.words, (str(i) for i in range(1000)))
+        self.assertLess(args.words.maxsize, 1000)
+        self.assertEqual(sorted(str(i) for i in range(1000)), sorted(args.seen))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,18 @@
+import contextlib
 import copy
+import http.server
+import io
+import json
+import os
+import tempfile
+import threading
 import unittest
+import urllib.parse
 
 import utils.testargs
+import onectf.impl.aio
+import onectf.impl.analysis
+import onectf.impl.calibration
 import onectf.jobs.request
 
 
@@ -11,12 +22,82 @@ base_request_data = onectf.jobs.request.RequestProgramData(
 )
 
 
+class RequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        """'b' is found, 'a' and 'c' are not found, and any other word is echoed."""
+        word = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)['x'][0]
+        if word == 'b':
+            body = b'<p>found</p>'
+        elif word in ['a', 'c']:
+            body = b''
+        else:
+            body = f'<p>Not found: {word}</p>'.encode()
+        self.send_response(404 if body == b'' else 200)
+        self.send_header('Content-Length', str(len(body)))
+        # a repeated header, joined by both engines
+        self.send_header('Set-Cookie', 'a=1')
+        self.send_header('Set-Cookie', 'b=2')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CalibrationHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Every word is forbidden and echoed, except 'admin' and 'root' (with the same number of words)."""
+        word = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)['x'][0]
+        if word == 'admin':
+            status, body = 200, b'<p>Welcome admin</p>'
+        elif word == 'root':
+            status, body = 403, b'<p>Locked account</p>'
+        else:
+            status, body = 403, f'<p>Forbidden: {word}</p>'.encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler=RequestHandler):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read_results(request_data):
+    request_data.output.close()
+    with open(request_data.output.path, 'r') as f:
+        return [json.loads(line) for line in f]
+
+
 class TestRequest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.outputs = 0
+
+    def new_request_data(self, test_args):
+        """Program data writing its results into a new JSONL file."""
+        self.outputs += 1
+        test_data = {}
+        test_data.update(base_test_data)
+        test_data.update({'output': os.path.join(self.directory, f'results-{self.outputs}.jsonl'), 'output_format': 'jsonl'})
+        test_data.update(test_args)
+        return onectf.jobs.request.RequestProgramData(
+            type('testData', (), test_data)
+        )
+
     def test_get_request(self):
-        request_data = copy.deepcopy(base_request_data)
-        request_data.url = 'https://example.com'
-        request_data.method = 'GET'
-        request_data.param = 'param'
+        request_data = self.new_request_data({'url': 'https://example.com?a=1&param=old&b=2#top', 'method': 'GET', 'param': 'param'})
+        (_, url, _, _, _, _) = request_data.inject_word('a b&c')
+        self.assertEqual('https://example.com?a=1&param=a+b%26c&b=2#top', url)
+        request_data = self.new_request_data({'url': 'https://example.com', 'method': 'GET', 'param': 'param'})
         (_, url, _, _, _, _) = request_data.inject_word('value')
         self.assertEqual('https://example.com?param=value', url)
 
@@ -35,8 +116,19 @@ class TestRequest(unittest.TestCase):
         request_data = onectf.jobs.request.RequestProgramData(
             type('testData', (), test_data)
         )
-        (_, _, headers, _, _, _) = request_data.inject_word('value')
-        self.assertEqual({'X': 'Z; Y=value'}, request_data.cookies)
+        (_, _, _, cookies, _, _) = request_data.inject_word('value')
+        self.assertEqual({'X': 'Z; Y=value'}, cookies)
+        self.assertEqual({'X': 'Z; Y=FUZZ'}, request_data.cookies)
+
+    def test_multiple_keywords(self):
+        request_data = self.new_request_data({'url': 'https://example.com/USER?p=PASS', 'use_fuzzing': True,
+                                              'headers': ['X-User: USER'],
+                                              'inject_wordlist': ['data/args/base.json:USER', 'data/args/http.json:PASS']})
+        (word, url, headers, _, _, _) = request_data.inject_word(('admin', 'secret'))
+        self.assertEqual('USER=admin, PASS=secret', word)
+        self.assertEqual('https://example.com/admin?p=secret', url)
+        self.assertEqual('admin', headers['X-User'])
+        self.assertEqual('USER', request_data.headers['X-User'])
 
     def test_multiple_headers(self):
         test_data = {}
@@ -47,6 +139,171 @@ class TestRequest(unittest.TestCase):
         )
         self.assertEqual({'X': 'Z; Y=Z'}, request_data.cookies)
 
+    def test_session_per_thread(self):
+        request_data = copy.deepcopy(base_request_data)
+        session = request_data.get_session()
+        self.assertIs(session, request_data.get_session())
+        other_sessions = []
+        thread = threading.Thread(target=lambda: other_sessions.append(request_data.get_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(session, other_sessions[0])
+        self.assertIs(session.get_adapter('https://'), other_sessions[0].get_adapter('https://'))
+
+    def test_async_engine_results(self):
+        server = start_server()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/'
+            results = {}
+            for engine in ['thread', 'async']:
+                request_data = self.new_request_data({'url': url, 'engine': engine})
+                if engine == 'async':
+                    onectf.impl.aio.start_async(onectf.jobs.request.do_job_async, request_data, ['a', 'b', 'c'])
+                else:
+                    for word in ['a', 'b', 'c']:
+                        onectf.jobs.request.do_job(request_data, word)
+                results[engine] = read_results(request_data)
+                for result in results[engine]:
+                    result['headers'].pop('Date')
+            self.assertEqual(1, len(results['thread']))
+            self.assertEqual('a=1, b=2', results['thread'][0]['headers']['Set-Cookie'])
+            self.assertEqual(results['thread'], results['async'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_async_engine_errors(self):
+        server = start_server()
+        try:
+            # the second word is not valid in the JSON payload
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/', 'method': 'POST',
+                                                  'use_json': True, 'payload': '{"x": "$_INJECT_$"}', 'engine': 'async',
+                                                  'resume': os.path.join(self.directory, 'state.json')})
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                onectf.impl.aio.start_async(onectf.jobs.request.execute_worker_task_async, request_data,
+                                            request_data.checkpoint.skip(['a', 'b"', 'c']))
+            self.assertIn('[ERROR]', output.getvalue())
+            # the word is completed like the others
+            self.assertEqual((3, set()), (request_data.checkpoint.offset, request_data.checkpoint.done))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_analysis_processes(self):
+        server = start_server()
+        try:
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/', 'processes': 2})
+            request_data.analysis = onectf.impl.analysis.AnalysisPool(
+                2, request_data.predicate, request_data.format,
+                lambda word, response, result: onectf.jobs.request.report(request_data, word, response, result))
+            for word in ['a', 'b', 'c', 'd'] * 20:
+                onectf.jobs.request.do_job(request_data, word)
+            request_data.analysis.close()
+            results = read_results(request_data)
+            self.assertEqual(40, len(results))
+            self.assertEqual(['b', 'd'], sorted({result['word'] for result in results}))
+            self.assertEqual('Not found: d\n', [result for result in results if result['word'] == 'd'][0]['content'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_analysis_checkpoint(self):
+        server = start_server()
+        try:
+            events = []
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/', 'processes': 2})
+            request_data.analysis = onectf.impl.analysis.AnalysisPool(
+                2, request_data.predicate, request_data.format,
+                lambda word, response, result: events.append(('report', word)),
+                lambda index: events.append(('done', index)), with_content=False)
+            words = ['a', 'b', 'c', 'd'] * 10
+            for index, word in enumerate(words):
+                onectf.jobs.request.do_job(request_data, word, index)
+            request_data.analysis.close()
+            # a word is only done once its result was reported
+            self.assertEqual(sorted(range(len(words))), sorted(index for event, index in events if event == 'done'))
+            for position, (event, value) in enumerate(events):
+                if event == 'done' and words[value] in ['b', 'd']:
+                    self.assertEqual(('report', words[value]), events[position - 1])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_raw_request(self):
+        server = start_server()
+        try:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt') as f:
+                f.write(f'GET /?x=FUZZ HTTP/1.1\nHost: 127.0.0.1:{server.server_port}\nAccept: */*\n\n')
+                f.flush()
+                request_data = self.new_request_data({'url': None, 'raw_request': f.name, 'param': None})
+            for word in ['a', 'b', 'c', 'd']:
+                onectf.jobs.request.do_job(request_data, word)
+            results = read_results(request_data)
+            self.assertEqual(['b', 'd'], [result['word'] for result in results])
+            self.assertEqual('Not found: d\n', results[1]['content'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_cluster(self):
+        server = start_server()
+        try:
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/', 'cluster': True})
+            for word in ['b', 'd', 'e', 'a', 'b', 'f g']:
+                onectf.jobs.request.do_job(request_data, word)
+            self.assertEqual([('b', 2, ['b', 'b']), ('d', 3, ['d', 'e', 'f g'])],
+                             [(result['samples'][0], result['count'], result['samples']) for result in request_data.clusters.results])
+            self.assertEqual('Not found: d\n', request_data.clusters.results[1]['content'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_auto_calibrate(self):
+        server = start_server()
+        try:
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/'})
+            onectf.jobs.request.do_job(request_data, 'unknown')
+            self.assertEqual(1, len(read_results(request_data)))
+
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/'})
+            onectf.impl.calibration.calibrate(request_data, onectf.jobs.request.send_request)
+            # the echoed payload is removed from the body, the pages are then identical
+            self.assertEqual({200: 'hash'}, {status: rule[0] for status, rule in request_data.predicate.calibration_rules.items()})
+            for word in ['a', 'b', 'c', 'unknown']:
+                onectf.jobs.request.do_job(request_data, word)
+            self.assertEqual(['b'], [result['word'] for result in read_results(request_data)])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_auto_calibrate_status(self):
+        server = start_server(CalibrationHandler)
+        try:
+            request_data = self.new_request_data({'url': f'http://127.0.0.1:{server.server_port}/'})
+            onectf.impl.calibration.calibrate(request_data, onectf.jobs.request.send_request)
+            self.assertEqual([403], list(request_data.predicate.calibration_rules))
+            for word in ['unknown', 'admin', 'root', 'other']:
+                onectf.jobs.request.do_job(request_data, word)
+            # the hits have as many words as the calibrated pages, but not the same status or body
+            self.assertEqual(['admin', 'root'], [result['word'] for result in read_results(request_data)])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_tamper_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wordlist = os.path.join(directory, 'words.txt')
+            with open(wordlist, 'w') as f:
+                f.write('a\nb c\n')
+            for _ in range(2):
+                # the first run writes the cache, the second one reads it
+                request_data = self.new_request_data({'url': 'https://example.com', 'method': 'GET', 'param': 'x', 'tamper': 'base64',
+                                                      'inject_wordlist': [wordlist], 'tamper_cache': os.path.join(directory, 'cache')})
+                urls = [request_data.inject_word(word)[1] for word in request_data.read_words()]
+                # the words are only tampered once
+                self.assertEqual(['https://example.com?x=YQ%3D%3D', 'https://example.com?x=YiBj'], urls)
+            self.assertEqual(2, len(os.listdir(os.path.join(directory, 'cache'))))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+import itertools
+import unittest
+
+import onectf.utils.filtering
+
+
+class TestFiltering(unittest.TestCase):
+    def test_interval_set(self):
+        values = onectf.utils.filtering.IntervalSet('5,0-100000,200-299,100001')
+        self.assertEqual([0], values.starts)
+        self.assertEqual([100001], values.ends)
+        self.assertIn(0, values)
+        self.assertIn(100001, values)
+        self.assertNotIn(-1, values)
+        self.assertNotIn(100002, values)
+
+        values = onectf.utils.filtering.IntervalSet('301, 200-299,401')
+        self.assertIn(250, values)
+        self.assertIn(301, values)
+        self.assertNotIn(300, values)
+        self.assertNotIn(400, values)
+        self.assertIn(404, onectf.utils.filtering.IntervalSet('all'))
+
+    def test_predicate(self):
+        matcher = onectf.utils.filtering.FilteringHandler(False, '200-299,403', None, 'flag', None, '1-10')
+        response_filter = onectf.utils.filtering.FilteringHandler(True, None, '2', None, '0-100', None)
+        predicate = onectf.utils.filtering.ResponsePredicate(matcher, response_filter)
+        self.assertTrue(predicate.needs_body)
+
+        for status_code, line_count, content, size, word_count in itertools.product(
+                [200, 403, 404], [1, 2], ['flag', 'none'], [50, 150], [5, 15]):
+            expected = matcher.is_valid(status_code, line_count, content, size, word_count) and \
+                response_filter.is_valid(status_code, line_count, content, size, word_count)
+            self.assertEqual(expected, predicate.is_valid(status_code, line_count, content, size, word_count))
+
+    def test_predicate_head_only(self):
+        matcher = onectf.utils.filtering.FilteringHandler(False, '200', None, None, None, None)
+        response_filter = onectf.utils.filtering.FilteringHandler(True, None, None, None, '0', None)
+        predicate = onectf.utils.filtering.ResponsePredicate(matcher, response_filter)
+        self.assertFalse(predicate.needs_body)
+        self.assertTrue(predicate.is_valid_head(200, 10))
+        self.assertFalse(predicate.is_valid_head(200, 0))
+        self.assertFalse(predicate.is_valid_head(404, 10))
+
+    def test_calibration_rules(self):
+        matcher = onectf.utils.filtering.FilteringHandler(False, 'all', None, None, None, None)
+        response_filter = onectf.utils.filtering.FilteringHandler(True, None, None, None, None, None)
+        predicate = onectf.utils.filtering.ResponsePredicate(matcher, response_filter)
+        predicate.add_calibration_rule(404, 'words', 4)
+        metrics = {'words': 4}.get
+        # the rule is only applied to the status code it was learned from
+        self.assertFalse(predicate.is_valid_calibrated(404, metrics))
+        self.assertTrue(predicate.is_valid_calibrated(200, metrics))
+        self.assertTrue(predicate.is_valid_calibrated(404, {'words': 5}.get))
+
+
+if __name__ == '__main__':
+    unittest.main()
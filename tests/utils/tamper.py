@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 
 import onectf.utils.tampering
+import onectf.utils.tampering_cache
 
 
 class TestRequest(unittest.TestCase):
@@ -9,6 +12,66 @@ class TestRequest(unittest.TestCase):
         encoded = tamper.apply("1")
         self.assertEqual(encoded, "cdd96d3cc73d1dbdaffa03cc6cd7339b")
 
+    def test_merged_replacements(self):
+        tamper = onectf.utils.tampering.TamperingHandler("aliases,space2tab")
+        self.assertEqual("cat\t'a'\t2>&1%0a", tamper.apply("cat <q>a<q> <er><lf>"))
+        tamper = onectf.utils.tampering.TamperingHandler("space2tab,url")
+        self.assertEqual("a%09b", tamper.apply("a b"))
+
+    def test_php_octal(self):
+        tamper = onectf.utils.tampering.TamperingHandler("php_octal")
+        self.assertEqual('"\\160\\150\\160\\151\\156\\146\\157"()', tamper.apply("phpinfo()"))
+
+    def test_apply_batch(self):
+        tamper = onectf.utils.tampering.TamperingHandler("aliases,base64", cache_size=2)
+        self.assertEqual(["YQ==", "Jw==", "YQ=="], tamper.apply_batch(["a", "<q>", "a"]))
+        tamper = onectf.utils.tampering.TamperingHandler("")
+        self.assertEqual(["a"], tamper.apply_batch(["a"]))
+
+    def test_tamper_cache(self):
+        tamper = onectf.utils.tampering.TamperingHandler("aliases,base64")
+        with tempfile.TemporaryDirectory() as directory:
+            wordlist = os.path.join(directory, 'words.txt')
+            with open(wordlist, 'w') as f:
+                f.write('a\n\n<q>é\n')
+            words = ['a', '', '<q>é']
+            expected = tamper.apply_batch(words)
+
+            cache = onectf.utils.tampering_cache.TamperCache(directory, wordlist, tamper)
+            self.assertFalse(cache.exists())
+            self.assertEqual(expected, list(cache.words(iter(words))))
+            self.assertTrue(cache.exists())
+            # the words are not read anymore
+            self.assertEqual(expected, list(cache.words([])))
+            # the words may not all be consumed (e.g., a pitchfork with a shorter wordlist)
+            words = cache.words([])
+            self.assertEqual(expected[0], next(words))
+            words.close()
+
+            other = onectf.utils.tampering.TamperingHandler("aliases")
+            self.assertFalse(onectf.utils.tampering_cache.TamperCache(directory, wordlist, other).exists())
+
+    def test_concurrent_tamper_cache(self):
+        tamper = onectf.utils.tampering.TamperingHandler("base64")
+        with tempfile.TemporaryDirectory() as directory:
+            wordlist = os.path.join(directory, 'words.txt')
+            with open(wordlist, 'w') as f:
+                f.write('a\nbb\nccc\n')
+            words = ['a', 'bb', 'ccc']
+            expected = tamper.apply_batch(words)
+
+            # Two wordlists with the same words are built at the same time
+            first = onectf.utils.tampering_cache.TamperCache(directory, wordlist, tamper).words(iter(words))
+            second = onectf.utils.tampering_cache.TamperCache(directory, wordlist, tamper).words(iter(words))
+            self.assertEqual(list(zip(expected, expected)), list(zip(first, second)))
+            self.assertEqual([], list(second))
+
+            cache = onectf.utils.tampering_cache.TamperCache(directory, wordlist, tamper)
+            self.assertTrue(cache.exists())
+            self.assertEqual(expected, list(cache.words([])))
+            # no temporary file is left
+            self.assertEqual(sorted([cache.key + '.data', cache.key + '.index', 'words.txt']), sorted(os.listdir(directory)))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file